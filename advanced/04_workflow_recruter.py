@@ -6,7 +6,7 @@ from typing import Any, List
 
 import requests
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from agno.db.sqlite import AsyncSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.workflow.types import WorkflowExecutionInput
 from agno.workflow.workflow import Workflow
@@ -278,7 +278,8 @@ async def recruitment_execution(
 recruitment_workflow = Workflow(
     name="Employee Recruitment Workflow (Simulated)",
     description="Automated candidate screening with simulated scheduling and email",
-    db=SqliteDb(
+    # Async driver (aiosqlite), so saving sessions never blocks the async agents in recruitment_execution
+    db=AsyncSqliteDb(
         session_table="workflow_session",
         db_file="tmp/workflows.db",
     ),
@@ -1,13 +1,27 @@
+from datetime import datetime
+
 from agno.agent.agent import Agent
 from agno.models.openai import OpenAIResponses
 from agno.os import AgentOS
 from agno.os.interfaces.agui import AGUI
+from agno.run.agent import RunInput
+
+
+def add_current_time(run_input: RunInput) -> None:
+    """Pre-hook that adds the current time to the user message.
+
+    `add_datetime_to_context` puts the time near the top of the system prompt, which
+    changes the prompt prefix on every run and defeats provider prompt caching.
+    """
+    if isinstance(run_input.input_content, str):
+        run_input.input_content += f"\n\nThe current time is {datetime.now():%Y-%m-%d %H:%M}."
+
 
 chat_agent = Agent(
     name="Assistant",
     model=OpenAIResponses(id="gpt-5.2"),
     instructions="You are a helpful AI assistant.",
-    add_datetime_to_context=True,
+    pre_hooks=[add_current_time],
     markdown=True,
 )
 
@@ -1,15 +1,17 @@
 from agno.agent import Agent
-from agno.db.postgres import PostgresDb
 from agno.models.openai import OpenAIResponses
 from agno.os import AgentOS
 from agno.tools import tool
+# Shared with the basic examples, `make run` puts ../../basic on the PYTHONPATH
+from postgres_store import PooledPostgresDb
 
 from dotenv import load_dotenv
 load_dotenv()
 
-# Database connection
+# Database connection: pool sized for concurrent runs, with prepared statements. Writes are not batched,
+# so every AgentOS worker reads the sessions the others just saved
 db_url = "postgresql+psycopg://ai:ai@localhost:5532/ai"
-db = PostgresDb(db_url=db_url)
+db = PooledPostgresDb(db_url=db_url, pool_size=20, max_overflow=10, pool_timeout=5.0)
 
 
 @tool(requires_confirmation=True)
@@ -59,5 +61,12 @@ agent_os = AgentOS(
 
 app = agent_os.get_app()
 
+
+@app.get("/metrics/db")
+def db_metrics():
+    """Pool wait time, query latency and write batching of the agent database."""
+    return db.metrics.snapshot(db.db_engine)
+
+
 if __name__ == "__main__":
     agent_os.serve(app="hitl_confirmation:app", port=7777)
\ No newline at end of file
@@ -40,3 +40,7 @@ for driver in analysis.key_drivers:
 print("Key Risks:")
 for risk in analysis.key_risks:
     print(f"  - {risk}")
+
+# The system prompt has no dynamic sections, so repeated runs reuse the provider's prompt cache
+if response.metrics:
+    print(f"Cached prompt tokens: {response.metrics.cache_read_tokens}")
@@ -1,19 +1,70 @@
+from contextvars import ContextVar
+from typing import Optional
+
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from sqlite_store import DeltaSqliteDb
 from agno.models.openai import OpenAIResponses
+from agno.session import AgentSession
 from agno.tools.yfinance import YFinanceTools
+from agno.utils.tokens import count_tokens
 
 from dotenv import load_dotenv
 load_dotenv()
 
-db = SqliteDb(db_file="tmp/agents.db")
+db = DeltaSqliteDb(db_file="tmp/agents.db")
+
+# Token budget for the prior runs replayed verbatim with each new run
+HISTORY_TOKEN_BUDGET = 2000
+MAX_HISTORY_RUNS = 5
+
+
+# Runs replayed by the current run, so concurrent runs of the agent each get their own budget
+_history_runs: ContextVar[Optional[int]] = ContextVar("history_runs", default=None)
+
+
+class BudgetedAgent(Agent):
+    """Agent whose num_history_runs is the budget_history of the current run, capped by the configured value."""
+
+    @property
+    def num_history_runs(self) -> Optional[int]:
+        runs = _history_runs.get()
+        return self._max_history_runs if runs is None else runs
 
-agent = Agent(
+    @num_history_runs.setter
+    def num_history_runs(self, value: Optional[int]) -> None:
+        self._max_history_runs = value
+
+
+def budget_history(agent: Agent, session: AgentSession) -> None:
+    """Pre-hook that sizes the verbatim history by tokens instead of by run count.
+
+    Keeps as many of the latest runs as fit in HISTORY_TOKEN_BUDGET (at least one).
+    Older runs reach the model through the cached session summary instead.
+    """
+    num_history_runs = 1
+    for last_n_runs in range(2, MAX_HISTORY_RUNS + 1):
+        # Tool results are not replayed (max_tool_calls_from_history=0), so they don't count
+        messages = session.get_messages(last_n_runs=last_n_runs, skip_roles=["system", "tool"])
+        if count_tokens(messages, model_id=agent.model.id) > HISTORY_TOKEN_BUDGET:
+            break
+        num_history_runs = last_n_runs
+    # Set for this run only: the agent itself is shared by every run
+    _history_runs.set(num_history_runs)
+
+
+agent = BudgetedAgent(
     model=OpenAIResponses(id="gpt-5.2"),
     tools=[YFinanceTools()],
     db=db,
     add_history_to_context=True,
-    num_history_runs=5,
+    num_history_runs=MAX_HISTORY_RUNS,
+    pre_hooks=[budget_history],
+    # Older turns are sent as a summary that is updated at the end of each run
+    enable_session_summaries=True,
+    add_session_summary_to_context=True,
+    # Raw YFinance payloads are dropped from history, the model can fetch them by reference
+    max_tool_calls_from_history=0,
+    read_tool_call_history=True,
     markdown=True,
 )
 
@@ -38,4 +89,4 @@ agent.print_response(
     "Which looks like the better investment?",
     session_id=session_id,
     stream=True,
-)
\ No newline at end of file
+)
@@ -1,8 +1,8 @@
 from agno.agent import Agent
 from agno.db.sqlite import SqliteDb
-from agno.memory import MemoryManager
 from agno.models.openai import OpenAIResponses
 from agno.tools.yfinance import YFinanceTools
+from memory_queue import BackgroundMemoryManager
 from rich.pretty import pprint
 
 from dotenv import load_dotenv
@@ -10,9 +10,13 @@ load_dotenv()
 
 db = SqliteDb(db_file="tmp/agents_memory.db")
 
-memory_manager = MemoryManager(
+# Only the memories relevant to each message reach the prompt and the memory model,
+# and memories are extracted in the background, a few turns per memory model call
+memory_manager = BackgroundMemoryManager(
     model=OpenAIResponses(id="gpt-5.2"),
     db=db,
+    top_k=8,
+    debounce_seconds=2.0,
 )
 
 agent = Agent(
@@ -20,7 +24,8 @@ agent = Agent(
     tools=[YFinanceTools()],
     db=db,
     memory_manager=memory_manager,
-    enable_agentic_memory=True,
+    pre_hooks=[memory_manager.retrieval_hook],
+    post_hooks=[memory_manager.queue_turn],
     markdown=True,
 )
 
@@ -33,14 +38,15 @@ agent.print_response(
     stream=True,
 )
 
-# The agent now knows your preferences
+# The agent now knows your preferences, even before they are saved as memories
 agent.print_response(
     "What stocks would you recommend for me?",
     user_id=user_id,
     stream=True,
 )
 
-# View stored memories
+# View stored memories, once the background extraction has run
+memory_manager.flush(user_id=user_id)
 memories = agent.get_user_memories(user_id=user_id)
 print("\nStored Memories:")
 pprint(memories)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from agno.agent import Agent
 from agno.models.openai import OpenAIResponses
-from agno.db.sqlite import SqliteDb
+from sqlite_store import BatchedSqliteDb
 from agno.team import Team
 from agno.tools.hackernews import HackerNewsTools
 from agno.tools.yfinance import YFinanceTools
@@ -44,7 +44,7 @@ content_planner = Agent(
 content_creation_workflow = Workflow(
     name="Content Creation Workflow",
     description="Automated content creation from blog posts to social media",
-    db=SqliteDb(db_file="tmp/workflow.db"),
+    db=BatchedSqliteDb(db_file="tmp/workflow.db"),
     steps=[research_team, content_planner],
     debug_mode=True,
 )
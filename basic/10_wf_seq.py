@@ -1,5 +1,5 @@
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from sqlite_store import DeltaSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.team import Team
 from agno.tools.hackernews import HackerNewsTools
@@ -54,7 +54,7 @@ content_planning_step = Step(
 content_creation_workflow = Workflow(
     name="Content Creation Workflow",
     description="Automated content creation from blog posts to social media",
-    db=SqliteDb(
+    db=DeltaSqliteDb(
         session_table="workflow_session",
         db_file="tmp/workflow.db",
     ),
@@ -1,4 +1,6 @@
-from typing import List
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List
 
 from agno.agent import Agent
 from agno.tools.hackernews import HackerNewsTools
@@ -6,12 +8,28 @@ from agno.tools.yfinance import YFinanceTools
 from agno.workflow import Loop, Step, Workflow
 from agno.workflow.types import StepOutput
 
+# Max tool calls of the research agent running at the same time
+research_tool_slots = threading.BoundedSemaphore(4)
+
+
+def limit_concurrency(function_call: Callable, arguments: Dict[str, Any]):
+    """
+    Tool hook that caps concurrent tool calls.
+
+    In async runs agno executes the tool calls of a model turn concurrently and keeps
+    their results in order, so a turn costs the latency of the slowest tool.
+    """
+    with research_tool_slots:
+        return function_call(**arguments)
+
+
 # Create agents for research
 research_agent = Agent(
     name="Research Agent",
     role="Research specialist",
     tools=[HackerNewsTools(), YFinanceTools()],
     instructions="You are a research specialist. Research the given topic thoroughly.",
+    tool_hooks=[limit_concurrency],
     markdown=True,
 )
 
@@ -80,7 +98,9 @@ workflow = Workflow(
 )
 
 if __name__ == "__main__":
-    # Test the workflow
-    workflow.print_response(
-        input="Research the latest trends in AI and machine learning, then create a summary",
-    )
\ No newline at end of file
+    # Test the workflow (async, so the research agent's tool calls run concurrently)
+    asyncio.run(
+        workflow.aprint_response(
+            input="Research the latest trends in AI and machine learning, then create a summary",
+        )
+    )
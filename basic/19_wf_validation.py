@@ -1,7 +1,7 @@
 from typing import List
 
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from sqlite_store import DeltaSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.team import Team
 from agno.tools.hackernews import HackerNewsTools
@@ -70,7 +70,7 @@ if __name__ == "__main__":
     content_creation_workflow = Workflow(
         name="Content Creation Workflow",
         description="Automated content creation from blog posts to social media",
-        db=SqliteDb(
+        db=DeltaSqliteDb(
             session_table="workflow_session",
             db_file="tmp/workflow.db",
         ),
@@ -1,5 +1,5 @@
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from sqlite_store import BatchedSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.workflow import WorkflowAgent
 from agno.workflow.types import StepInput
@@ -34,7 +34,7 @@ workflow = Workflow(
     description="A workflow that generates stories, formats them, and adds references",
     agent=workflow_agent,
     steps=[story_writer, story_formatter, add_references],
-    db=SqliteDb(db_file="tmp/workflow.db"),
+    db=BatchedSqliteDb(db_file="tmp/workflow.db"),
 )
 
 def main():
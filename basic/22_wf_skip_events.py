@@ -1,5 +1,5 @@
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from sqlite_store import BatchedSqliteDb, DeltaSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.run.agent import (
     RunContentEvent,
@@ -66,7 +66,7 @@ print("=== Simple Step Workflow with Event Storage ===")
 step_workflow = Workflow(
     name="Simple Step Workflow",
     description="Basic workflow demonstrating step event storage",
-    db=SqliteDb(
+    db=DeltaSqliteDb(
         session_table="workflow_session",
         db_file="tmp/workflow.db",
     ),
@@ -119,7 +119,7 @@ parallel_workflow = Workflow(
         ),
         Step(name="Combine Results", agent=analysis_agent),
     ],
-    db=SqliteDb(
+    db=BatchedSqliteDb(
         session_table="workflow_parallel",
         db_file="tmp/workflow_parallel.db",
     ),
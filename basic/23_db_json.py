@@ -1,18 +1,25 @@
 from agno.agent import Agent
-from agno.db.json import JsonDb
+from json_store import ShardedJsonDb
 from agno.models.openai import OpenAIResponses
 from agno.tools.hackernews import HackerNewsTools
 from dotenv import load_dotenv
 load_dotenv()
 
-# Setup the JSON database
-db = JsonDb(db_path="tmp/json_db")
+# Setup the JSON database, sharded and append-only so it scales to many sessions
+db = ShardedJsonDb(db_path="tmp/json_db")
 
 agent = Agent(
     model=OpenAIResponses(id="gpt-5.2"),
     db=db,
     tools=[HackerNewsTools()],
     add_history_to_context=True,
+    num_history_runs=2,
+    # Older turns are sent as a summary instead of being reloaded verbatim
+    enable_session_summaries=True,
+    add_session_summary_to_context=True,
+    # Raw HackerNews payloads are dropped from history, the model can fetch them by reference
+    max_tool_calls_from_history=0,
+    read_tool_call_history=True,
 )
 agent.print_response("How many people live in Canada?")
 agent.print_response("What is their national anthem called?")
\ No newline at end of file
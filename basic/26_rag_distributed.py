@@ -9,24 +9,69 @@ Team Composition:
 - Data Validator: Validates retrieved data quality and relevance
 - Response Composer: Composes final responses with proper source attribution
 
+The Vector Retriever and Hybrid Searcher are independent, so they are grouped in a
+Retrieval Team with `delegate_to_all_members=True`. The team leader issues a single
+delegation to that sub-team, and under `arun`/`aprint_response` both retrievers run
+concurrently (asyncio.gather) and their outputs are merged before the leader's next
+turn. Retrieval then costs roughly one member's latency instead of the sum.
+
+Member responses are streamed to the console as they are produced, and the
+`spill_member_responses` post-hook keeps the stored TeamRunOutput bounded: long
+member content is written to `tmp/member_responses/` and truncated to a preview,
+while member messages, references and tool results are dropped.
+
 Setup:
 1. Run: `./cookbook/run_pgvector.sh` to start a postgres container with pgvector
 2. Run: `uv pip install openai sqlalchemy 'psycopg[binary]' pgvector agno`
 3. Run this script to see distributed PgVector RAG in action
 """
 
-import asyncio  # noqa: F401
+import asyncio
+from pathlib import Path
 
 from agno.agent import Agent
 from agno.knowledge.embedder.openai import OpenAIEmbedder
 from agno.knowledge.knowledge import Knowledge
 from agno.models.openai import OpenAIResponses
+from agno.run.team import TeamRunOutput
 from agno.team.team import Team
 from agno.vectordb.pgvector import PgVector, SearchType
 
 # Database connection URL
 db_url = "postgresql+psycopg://ai:ai@localhost:5532/ai"
 
+# Member outputs longer than this are spilled to disk and truncated on the team output
+MEMBER_RESPONSE_MAX_CHARS = 2000
+MEMBER_RESPONSE_SPILL_DIR = Path("tmp/member_responses")
+
+
+def spill_member_responses(run_output: TeamRunOutput) -> None:
+    """Post-hook that bounds the member responses kept on the team output.
+
+    The member events were already streamed to the consumer, so only a preview of
+    each member's content is kept in memory; the full text is spilled to disk.
+    """
+    for member_response in run_output.member_responses:
+        if isinstance(member_response, TeamRunOutput):
+            spill_member_responses(member_response)
+
+        content = member_response.content
+        if isinstance(content, str) and len(content) > MEMBER_RESPONSE_MAX_CHARS:
+            spill_file = MEMBER_RESPONSE_SPILL_DIR / f"{member_response.run_id}.md"
+            spill_file.parent.mkdir(parents=True, exist_ok=True)
+            spill_file.write_text(content)
+            member_response.content = (
+                f"{content[:MEMBER_RESPONSE_MAX_CHARS]}\n\n[Truncated - full response in {spill_file}]"
+            )
+
+        # Drop the bulky retrieval payloads, they are not needed after the run
+        member_response.messages = None
+        member_response.references = None
+        member_response.events = None
+        for tool in member_response.tools or []:
+            tool.result = None
+
+
 # Vector-focused knowledge base for similarity search
 vector_knowledge = Knowledge(
     vector_db=PgVector(
@@ -79,6 +124,22 @@ hybrid_searcher = Agent(
     markdown=True,
 )
 
+# Retrieval Team - Runs both retrievers concurrently with a single batched delegation
+retrieval_team = Team(
+    name="Retrieval Team",
+    model=OpenAIResponses(id="gpt-5.2"),
+    role="Retrieve information with vector and hybrid search in parallel",
+    members=[vector_retriever, hybrid_searcher],
+    delegate_to_all_members=True,
+    instructions=[
+        "Send the user's query to all members in a single delegation.",
+        "Merge the vector and hybrid search results, removing duplicates.",
+        "Keep the source of each retrieved passage.",
+    ],
+    show_members_responses=True,
+    markdown=True,
+)
+
 # Data Validator Agent - Specialized in data quality validation
 data_validator = Agent(
     name="Data Validator",
@@ -113,17 +174,18 @@ response_composer = Agent(
 distributed_pgvector_team = Team(
     name="Distributed PgVector RAG Team",
     model=OpenAIResponses(id="gpt-5.2"),
-    members=[vector_retriever, hybrid_searcher, data_validator, response_composer],
+    members=[retrieval_team, data_validator, response_composer],
     instructions=[
         "Work together to provide comprehensive RAG responses using PostgreSQL pgvector.",
-        "Vector Retriever: First perform vector similarity search.",
-        "Hybrid Searcher: Then perform hybrid search for comprehensive coverage.",
+        "Retrieval Team: First run vector and hybrid search together in one delegation.",
         "Data Validator: Validate and filter the retrieved information quality.",
         "Response Composer: Compose the final response with proper attribution.",
         "Leverage PostgreSQL's scalability and pgvector's performance.",
         "Ensure enterprise-grade reliability and accuracy.",
     ],
     show_members_responses=True,
+    stream_member_events=True,
+    post_hooks=[spill_member_responses],
     markdown=True,
 )
 
@@ -144,7 +206,7 @@ async def async_pgvector_rag_demo():
             url="https://agno-public.s3.amazonaws.com/recipes/ThaiRecipes.pdf"
         )
         # Run async distributed PgVector RAG
-        await distributed_pgvector_team.aprint_response(input=query)
+        await distributed_pgvector_team.aprint_response(input=query, stream=True)
     except Exception as e:
         print(f"❌ Error: {e}")
         print("💡 Make sure PostgreSQL with pgvector is running!")
@@ -167,7 +229,7 @@ def sync_pgvector_rag_demo():
             url="https://agno-public.s3.amazonaws.com/recipes/ThaiRecipes.pdf"
         )
         # Run distributed PgVector RAG
-        distributed_pgvector_team.print_response(input=query)
+        distributed_pgvector_team.print_response(input=query, stream=True)
     except Exception as e:
         print(f"❌ Error: {e}")
         print("💡 Make sure PostgreSQL with pgvector is running!")
@@ -195,7 +257,7 @@ def complex_query_demo():
             url="https://agno-public.s3.amazonaws.com/recipes/ThaiRecipes.pdf"
         )
 
-        distributed_pgvector_team.print_response(input=query)
+        distributed_pgvector_team.print_response(input=query, stream=True)
     except Exception as e:
         print(f"❌ Error: {e}")
         print("💡 Make sure PostgreSQL with pgvector is running!")
@@ -204,9 +266,10 @@ def complex_query_demo():
 
 if __name__ == "__main__":
     # Choose which demo to run
+    # The async demo runs the retrievers concurrently; the sync demos run them one after another
 
-    # asyncio.run(async_pgvector_rag_demo())
+    asyncio.run(async_pgvector_rag_demo())
 
     # complex_query_demo()
 
-    sync_pgvector_rag_demo()
\ No newline at end of file
+    # sync_pgvector_rag_demo()
@@ -1,20 +1,28 @@
-from agno.learn import LearningMachine, SessionContextConfig
+from agno.learn import SessionContextConfig
 
 from agno.agent import Agent
 from agno.models.openai import OpenAIResponses
-from agno.db.sqlite import SqliteDb
+from learning_queue import QueuedLearningMachine
+from sqlite_store import BatchedSqliteDb
+from prompt_cache import prompt_prefix_hook
 
 from dotenv import load_dotenv
 load_dotenv()
 
-db = SqliteDb(db_file="tmp/agents.db")
+db = BatchedSqliteDb(db_file="tmp/agents.db")
+
 
 agent = Agent(
     model=OpenAIResponses(id="gpt-5.2"),
     db=db,
-    learning=LearningMachine(
+    # Plan updates run on background workers, the next run of the session waits for them
+    learning=QueuedLearningMachine(
         session_context=SessionContextConfig(enable_planning=True),
+        workers=4,
+        max_pending=64,
     ),
+    # The learned session context (plan and progress) changes every run and comes after the instructions
+    post_hooks=[prompt_prefix_hook("<session_context>")],
     markdown=True,
     debug_mode=True,
 )
@@ -1,19 +1,29 @@
+import os
+
 from agno.agent import Agent
-from agno.db.postgres import PostgresDb
-from agno.db.sqlite import SqliteDb
 from agno.learn import LearningMachine, DecisionLogConfig
 from agno.models.openai import OpenAIChat
+from decision_log_store import IndexedDecisionLogStore
+from postgres_store import PooledPostgresDb, PooledSqliteDb
 
 from dotenv import load_dotenv
 load_dotenv()
 
+# Postgres when PG_DB_URL is set (e.g. postgresql+psycopg://ai:ai@localhost:5532/ai), else a local SQLite stand-in
+pg_db_url = os.getenv("PG_DB_URL")
+db = PooledPostgresDb(db_url=pg_db_url) if pg_db_url else PooledSqliteDb(db_file="tmp/29_decisions_logs.db")
+
+# Decisions in their own indexed table, searchable without scanning every learning
+decision_log_store = IndexedDecisionLogStore(config=DecisionLogConfig(db=db))
+# One-off migration on the first start: copy the decisions the stock store saved in the learnings table
+if not decision_log_store.query(page_size=1).decisions:
+    decision_log_store.import_learnings()
+
 agent = Agent(
     id="my-agent",
     model=OpenAIChat(id="gpt-4o"),
-    db=SqliteDb(db_file="tmp/29_decisions_logs.db"),
-    learning=LearningMachine(
-        decision_log=DecisionLogConfig(),
-    ),
+    db=db,
+    learning=LearningMachine(decision_log=decision_log_store),
     instructions=[
         "When you make a significant choice, use log_decision to record it.",
         "Include your reasoning and alternatives you considered.",
@@ -26,5 +36,8 @@ agent.print_response(
 )
 
 # View logged decisions
-lm = agent.get_learning_machine()
-lm.decision_log_store.print(agent_id="my-agent", limit=5)
\ No newline at end of file
+decision_log_store.print(agent_id="my-agent", limit=5)
+# Filtered, paged queries: pass next_cursor back to get the following page
+page = decision_log_store.query(session_id="session_1", text_query="scraping", page_size=20)
+for decision in page.decisions:
+    print(decision.created_at, decision.decision)
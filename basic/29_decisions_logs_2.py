@@ -1,10 +1,10 @@
-from agno.learn import LearningMachine, LearningMode, DecisionLogConfig
+from agno.learn import LearningMode, DecisionLogConfig
 
 from agno.agent import Agent
 from agno.db.sqlite import SqliteDb
-from agno.learn import LearningMachine, DecisionLogConfig
 from agno.models.openai import OpenAIChat
 from agno.tools.duckduckgo import DuckDuckGoTools
+from learning_queue import QueuedLearningMachine
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -15,11 +15,18 @@ agent = Agent(
     id="my-agent",
     model=OpenAIChat(id="gpt-4o"),
     db=db,
-    learning=LearningMachine(
+    # Decisions are logged by background workers, not inside the run
+    learning=QueuedLearningMachine(
         decision_log=DecisionLogConfig(mode=LearningMode.ALWAYS),
+        workers=2,
     ),
     tools=[DuckDuckGoTools()],
 )
 
 agent.print_response("What are the latest developments in AI agents?")
-# Tool calls are automatically recorded as decisions
\ No newline at end of file
+# Tool calls are automatically recorded as decisions
+
+# Wait for the background workers before reading the log
+lm = agent.get_learning_machine()
+lm.flush()
+lm.decision_log_store.print(agent_id="my-agent", limit=5)
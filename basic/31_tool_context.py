@@ -1,7 +1,8 @@
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from sqlite_store import BatchedSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.run import RunContext
+from prompt_cache import prompt_prefix_hook
 
 
 from dotenv import load_dotenv
@@ -21,13 +22,17 @@ agent = Agent(
     model=OpenAIResponses(id="gpt-5.2"),
     # Initialize the session state with a counter starting at 0 (this is the default session state for all users)
     session_state={"shopping_list": []},
-    db=SqliteDb(db_file="tmp/agents.db"),
+    db=BatchedSqliteDb(db_file="tmp/agents.db"),
     tools=[add_item],
-    # You can use variables from the session state in the instructions
-    instructions="Current state (shopping list) is: {shopping_list}",
+    # Keep the instructions static so the prompt prefix can be cached by the provider
+    instructions="You manage the user's shopping list. The current list is in the session state.",
+    # The session state is added at the end of the system prompt instead of inside the instructions
+    add_session_state_to_context=True,
+    # The session state is the only dynamic section and agno appends it last
+    post_hooks=[prompt_prefix_hook("<session_state>")],
     markdown=True,
 )
 
 # Example usage
 agent.print_response("Add milk, eggs, and bread to the shopping list", stream=True)
-print(f"Final session state: {agent.get_session_state()}")
\ No newline at end of file
+print(f"Final session state: {agent.get_session_state()}")
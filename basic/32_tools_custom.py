@@ -1,11 +1,27 @@
+import asyncio
 import json
+from importlib.util import find_spec
+
 import httpx
 
 from agno.agent import Agent
+from agno.tools import Toolkit
 
 from dotenv import load_dotenv
 load_dotenv()
 
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+# Max story requests in flight at once, and how long to wait for each story
+MAX_CONCURRENT_REQUESTS = 10
+STORY_TIMEOUT_SECONDS = 3.0
+
+# Shared clients: connections to the Hacker News API are pooled and kept alive across
+# requests and tool calls instead of paying a new TCP+TLS handshake for each one.
+# HTTP/2 is used when the optional `h2` package is installed.
+hn_limits = httpx.Limits(max_keepalive_connections=MAX_CONCURRENT_REQUESTS, keepalive_expiry=30.0)
+hn_client = httpx.Client(base_url=HN_API_URL, http2=find_spec("h2") is not None, limits=hn_limits)
+hn_async_client = httpx.AsyncClient(base_url=HN_API_URL, http2=find_spec("h2") is not None, limits=hn_limits)
+
 def get_top_hackernews_stories(num_stories: int = 10) -> str:
     """Use this function to get top stories from Hacker News.
 
@@ -14,18 +30,68 @@ def get_top_hackernews_stories(num_stories: int = 10) -> str:
     """
 
     # Fetch top story IDs
-    response = httpx.get('https://hacker-news.firebaseio.com/v0/topstories.json')
+    response = hn_client.get('/topstories.json')
     story_ids = response.json()
 
     # Fetch story details
     stories = []
     for story_id in story_ids[:num_stories]:
-        story_response = httpx.get(f'https://hacker-news.firebaseio.com/v0/item/{story_id}.json')
+        story_response = hn_client.get(f'/item/{story_id}.json')
         story = story_response.json()
         if "text" in story:
             story.pop("text", None)
         stories.append(story)
     return json.dumps(stories)
 
-agent = Agent(tools=[get_top_hackernews_stories], markdown=True, debug_mode=True)
-agent.print_response("Summarize the top 5 stories on hackernews?", stream=True)
\ No newline at end of file
+async def aget_top_hackernews_stories(num_stories: int = 10) -> str:
+    """Use this function to get top stories from Hacker News.
+
+    Args:
+        num_stories (int): Number of stories to return. Defaults to 10.
+    """
+
+    # Fetch top story IDs
+    response = await hn_async_client.get('/topstories.json')
+    story_ids = response.json()
+
+    # Fetch story details concurrently, at most MAX_CONCURRENT_REQUESTS at a time
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def fetch_story(story_id: int):
+        async with semaphore:
+            try:
+                story_response = await asyncio.wait_for(
+                    hn_async_client.get(f'/item/{story_id}.json'), timeout=STORY_TIMEOUT_SECONDS
+                )
+                story_response.raise_for_status()
+            except (asyncio.TimeoutError, httpx.HTTPError):
+                return None
+        story = story_response.json()
+        if story and "text" in story:
+            story.pop("text", None)
+        return story
+
+    results = await asyncio.gather(*[fetch_story(story_id) for story_id in story_ids[:num_stories]])
+    # Slow or failed stories are skipped, so the agent still gets partial results
+    stories = [story for story in results if story is not None]
+    return json.dumps(stories)
+
+# The async variant is used automatically by agent.arun() and agent.aprint_response()
+hackernews_tools = Toolkit(
+    name="hackernews_tools",
+    tools=[get_top_hackernews_stories],
+    async_tools=[(aget_top_hackernews_stories, "get_top_hackernews_stories")],
+)
+
+agent = Agent(tools=[hackernews_tools], markdown=True, debug_mode=True)
+
+
+async def main():
+    try:
+        await agent.aprint_response("Summarize the top 5 stories on hackernews?", stream=True)
+    finally:
+        hn_client.close()
+        await hn_async_client.aclose()
+
+
+asyncio.run(main())
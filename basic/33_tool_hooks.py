@@ -1,38 +1,70 @@
-import time
+import asyncio
+import threading
 from typing import Any, Callable, Dict
 
 from agno.agent import Agent
 from agno.models.openai import OpenAIResponses
+from agno.os import AgentOS
+from agno.run.team import TeamRunOutput
 from agno.team import Team
 from agno.tools.hackernews import HackerNewsTools
 from agno.tools.yfinance import YFinanceTools
-from agno.utils.log import logger
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from tool_cache import TieredToolCache
+from tool_metrics import ToolMetrics
 
-def logger_hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+
+def concurrency_limit_hook(max_concurrent_calls: int) -> Callable:
     """
-    Tool hook that logs function calls and measures execution time.
+    Create a tool hook that caps how many tool calls of an agent run at the same time.
+
+    In async runs agno executes all tool calls of a model turn concurrently (async tools
+    with asyncio.gather, sync tools in worker threads) and returns the results in the
+    original order. Calls over the cap wait for a free slot.
 
     Args:
-        function_name: Name of the function being called
-        function_call: The actual function to call
-        arguments: Arguments passed to the function
+        max_concurrent_calls: Max number of tool calls running at once
 
     Returns:
-        The result of the function call
+        The tool hook
     """
-    if function_name == "delegate_task_to_member":
-        member_id = arguments.get("member_id")
-        logger.info(f"Delegating task to member {member_id}")
+    slots = threading.BoundedSemaphore(max_concurrent_calls)
+
+    def limit_concurrency(function_call: Callable, arguments: Dict[str, Any]):
+        with slots:
+            return function_call(**arguments)
+
+    return limit_concurrency
+
+
+# Shared by both agents, so repeated questions across the team hit memory
+tool_cache = TieredToolCache(cache_ttl=3600)
+tool_metrics = ToolMetrics(tool_cache=tool_cache)
 
-    # Start timer
-    start_time = time.time()
-    result = function_call(**arguments)
-    # End timer
-    end_time = time.time()
-    duration = end_time - start_time
-    logger.info(f"Function {function_name} took {duration:.2f} seconds to execute")
-    return result
+
+# Max characters of each member response kept on the team output
+MEMBER_RESPONSE_MAX_CHARS = 1000
+
+
+def truncate_member_responses(run_output: TeamRunOutput) -> None:
+    """
+    Post-hook that truncates member responses on the team output.
+
+    Member responses are streamed to the console while the team runs, so the
+    stored output only needs a preview of each one.
+
+    Args:
+        run_output: The team run output
+    """
+    for member_response in run_output.member_responses:
+        content = member_response.content
+        if isinstance(content, str) and len(content) > MEMBER_RESPONSE_MAX_CHARS:
+            member_response.content = f"{content[:MEMBER_RESPONSE_MAX_CHARS]}... [truncated]"
+        member_response.messages = None
+        for tool in member_response.tools or []:
+            tool.result = None
 
 
 # News agent with tool hooks
@@ -40,11 +72,13 @@ news_agent = Agent(
     name="News Agent",
     id="news-agent",
     role="Search HackerNews for information",
-    tools=[HackerNewsTools(cache_results=True)],
+    tools=[HackerNewsTools()],
     instructions=[
         "Find information about the company on HackerNews",
     ],
-    tool_hooks=[logger_hook],
+    # The tiered cache replaces the file-only cache of cache_results=True.
+    # The concurrency limit is innermost, so cache hits don't take a slot
+    tool_hooks=[tool_metrics, tool_cache, concurrency_limit_hook(4)],
 )
 
 # Finance agent with tool hooks
@@ -52,12 +86,14 @@ finance_agent = Agent(
     name="Finance Agent",
     id="finance-agent",
     role="Get stock prices and financial data",
-    model=OpenAIResponses(id="gpt-5.2"),
-    tools=[YFinanceTools(cache_results=True)],
+    # Let the model request price and fundamentals in the same turn
+    model=OpenAIResponses(id="gpt-5.2", parallel_tool_calls=True),
+    tools=[YFinanceTools()],
     instructions=[
         "Get stock prices and financial information",
+        "Request all the data you need in a single turn.",
     ],
-    tool_hooks=[logger_hook],
+    tool_hooks=[tool_metrics, tool_cache, concurrency_limit_hook(4)],
 )
 
 # Create team with tool hooks
@@ -74,11 +110,36 @@ research_team = Team(
         "Use the news agent for HackerNews discussions and finance agent for stock data.",
     ],
     show_members_responses=True,
-    tool_hooks=[logger_hook],
+    stream_member_events=True,
+    post_hooks=[truncate_member_responses],
+    # Delegation is an async tool in async runs (like under AgentOS), so the team needs the async hook
+    tool_hooks=[tool_metrics.acall],
 )
 
+# Serve the team with AgentOS and export the tool metrics next to its routes
+base_app = FastAPI()
+
+
+@base_app.get("/metrics/tools", response_class=PlainTextResponse)
+def tool_metrics_prometheus() -> str:
+    return tool_metrics.to_prometheus()
+
+
+@base_app.get("/metrics/tools.json")
+def tool_metrics_snapshot() -> Dict[str, Any]:
+    return tool_metrics.snapshot()
+
+
+agent_os = AgentOS(teams=[research_team], base_app=base_app)
+app = agent_os.get_app()
+
+
 if __name__ == "__main__":
-    research_team.print_response(
-        "Research NVIDIA - get the stock price and find any HackerNews discussions.",
-        stream=True,
-    )
\ No newline at end of file
+    # Async run: tool calls requested in the same model turn execute concurrently
+    asyncio.run(
+        research_team.aprint_response(
+            "Research NVIDIA - get the stock price and find any HackerNews discussions.",
+            stream=True,
+        )
+    )
+    print(tool_metrics.to_prometheus())
@@ -1,7 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+
 import httpx
 from agno.agent import Agent
 from agno.tools import tool
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
+
+from tool_cache import TieredToolCache
+
+# Max story requests in flight at once, and how long to wait for each story
+MAX_CONCURRENT_REQUESTS = 10
+STORY_TIMEOUT_SECONDS = 3.0
+
+# Shared client: connections to the Hacker News API are pooled and kept alive across
+# requests and tool calls. HTTP/2 is used when the optional `h2` package is installed.
+hn_client = httpx.Client(
+    base_url="https://hacker-news.firebaseio.com/v0",
+    http2=find_spec("h2") is not None,
+    limits=httpx.Limits(max_keepalive_connections=MAX_CONCURRENT_REQUESTS, keepalive_expiry=30.0),
+)
 
 def logger_hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]):
     """Hook function that wraps the tool execution"""
@@ -10,15 +27,15 @@ def logger_hook(function_name: str, function_call: Callable, arguments: Dict[str
     print(f"Function call completed with result: {result}")
     return result
 
+# Memory LRU (bounded by entries and bytes) in front of the file cache, sharing concurrent identical calls
+tool_cache = TieredToolCache(cache_ttl=3600, max_entries=128)
+
 @tool(
     name="fetch_hackernews_stories",                # Custom name for the tool (otherwise the function name is used)
     description="Get top stories from Hacker News",  # Custom description (otherwise the function docstring is used)
     stop_after_tool_call=True,                      # Return the result immediately after the tool call and stop the agent
-    tool_hooks=[logger_hook],                       # Hook to run before and after execution
+    tool_hooks=[logger_hook, tool_cache],           # Hooks to run before and after execution (memory + file cache)
     requires_confirmation=True,                     # Requires user confirmation before execution
-    cache_results=True,                             # Enable caching of results
-    cache_dir="/tmp/agno_cache",                    # Custom cache directory
-    cache_ttl=3600                                  # Cache TTL in seconds (1 hour)
 )
 def get_top_hackernews_stories(num_stories: int = 5) -> str:
     """
@@ -31,17 +48,29 @@ def get_top_hackernews_stories(num_stories: int = 5) -> str:
         str: The top stories in text format
     """
     # Fetch top story IDs
-    response = httpx.get("https://hacker-news.firebaseio.com/v0/topstories.json")
+    response = hn_client.get("/topstories.json")
     story_ids = response.json()
 
-    # Get story details
-    stories = []
-    for story_id in story_ids[:num_stories]:
-        story_response = httpx.get(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json")
-        story = story_response.json()
-        stories.append(f"{story.get('title')} - {story.get('url', 'No URL')}")
+    def fetch_story(story_id: int) -> Optional[str]:
+        try:
+            story_response = hn_client.get(f"/item/{story_id}.json", timeout=STORY_TIMEOUT_SECONDS)
+            story_response.raise_for_status()
+        except httpx.HTTPError:
+            return None
+        story = story_response.json() or {}
+        return f"{story.get('title')} - {story.get('url', 'No URL')}"
+
+    # Get story details concurrently over the shared client, keeping the original order
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        results = executor.map(fetch_story, story_ids[:num_stories])
 
+    # Slow or failed stories are skipped, so the agent still gets partial results
+    stories = [story for story in results if story is not None]
     return "\n".join(stories)
 
 agent = Agent(tools=[get_top_hackernews_stories])
-agent.print_response("Show me the top news from Hacker News")
\ No newline at end of file
+try:
+    agent.print_response("Show me the top news from Hacker News")
+finally:
+    hn_client.close()
+print(f"Cache stats: {tool_cache.stats}")
@@ -1,43 +1,77 @@
-from typing import List
+import asyncio
+import os
+import signal
+import time
+from typing import Callable, List, Optional
 
 from agno.agent import Agent
-from agno.tools import Toolkit
 from agno.utils.log import logger
 
+from toolkit_schemas import CachedSchemaToolkit
+
 from dotenv import load_dotenv
 load_dotenv()
 
-class ShellTools(Toolkit):
-    def __init__(self, working_directory: str = "/", **kwargs):
+
+class ShellTools(CachedSchemaToolkit):
+    def __init__(
+        self,
+        working_directory: str = "/",
+        timeout: float = 60.0,
+        on_output_line: Optional[Callable[[str], None]] = None,
+        max_concurrent_commands: int = 8,
+        **kwargs,
+    ):
         self.working_directory = working_directory
+        # Wall-clock limit for a shell command, in seconds
+        self.timeout = timeout
+        # Optional callback that receives the command output line by line, as it is produced
+        self.on_output_line = on_output_line
+
+        # Bounded pool of concurrent subprocesses for async runs; extra commands wait in line
+        self._subprocess_slots = asyncio.Semaphore(max_concurrent_commands)
+        self.subprocess_stats = {"queued": 0, "running": 0, "completed": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
 
         tools = [
             self.run_shell_command,
             self.list_files,
         ]
 
-        super().__init__(name="shell_tools", tools=tools, **kwargs)
+        # Async tools for agent.arun() and agent.aprint_response()
+        async_tools = [
+            (self.arun_shell_command, "run_shell_command"),
+        ]
+
+        super().__init__(name="shell_tools", tools=tools, async_tools=async_tools, **kwargs)
 
-    def list_files(self, directory: str):
+    def list_files(self, directory: str, offset: int = 0, limit: int = 500):
         """
-        List the files in the given directory.
+        List the files in the given directory, one page at a time.
 
         Args:
             directory (str): The directory to list the files from.
+            offset (int): The number of entries to skip.
+            limit (int): The max number of entries to return.
         Returns:
             str: The list of files in the directory.
         """
-        import os
-
         # List files relative to the toolkit's working_directory
         path = os.path.join(self.working_directory, directory)
         try:
-            files = os.listdir(path)
+            # os.scandir streams the entries, so huge directories are never loaded whole
+            files = []
+            with os.scandir(path) as entries:
+                for index, entry in enumerate(entries):
+                    if index < offset:
+                        continue
+                    if len(files) == limit:
+                        files.append(f"... more entries, call again with offset={offset + limit}")
+                        break
+                    files.append(entry.name)
             return "\n".join(files)
         except Exception as e:
             logger.warning(f"Failed to list files in {path}: {e}")
             return f"Error: {e}"
-        return os.listdir(directory)
 
     def run_shell_command(self, args: List[str], tail: int = 100) -> str:
         """
@@ -45,25 +79,158 @@ class ShellTools(Toolkit):
 
         Args:
             args (List[str]): The command to run as a list of strings.
-            tail (int): The number of lines to return from the output.
+            tail (int): The number of lines to return from the output, 0 for all of them.
         Returns:
             str: The output of the command.
         """
         import subprocess
+        import threading
+        from collections import deque
+
+        if tail < 0:
+            return f"Error: tail must be 0 or more, got {tail}"
 
         logger.info(f"Running shell command: {args}")
         try:
-            logger.info(f"Running shell command: {args}")
-            result = subprocess.run(args, capture_output=True, text=True, cwd=self.working_directory)
-            logger.debug(f"Result: {result}")
-            logger.debug(f"Return code: {result.returncode}")
-            if result.returncode != 0:
-                return f"Error: {result.stderr}"
-            # return only the last n lines of the output
-            return "\n".join(result.stdout.split("\n")[-tail:])
+            process = subprocess.Popen(
+                args,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+                cwd=self.working_directory,
+                # Own process group, so a timeout also kills the command's children
+                start_new_session=True,
+            )
         except Exception as e:
             logger.warning(f"Failed to run shell command: {e}")
             return f"Error: {e}"
 
+        # Kill the command if it runs past the timeout
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()
+
+        timer = threading.Timer(self.timeout, kill_on_timeout)
+        timer.start()
+
+        # Read the output incrementally and keep only the last `tail` lines in memory.
+        # Reads are capped at 64KB so a huge line without newlines can't blow up memory.
+        last_lines: deque = deque(maxlen=tail or None)
+        try:
+            for line in iter(lambda: process.stdout.readline(64 * 1024), ""):  # type: ignore
+                line = line.rstrip("\n")
+                last_lines.append(line)
+                if self.on_output_line is not None:
+                    self.on_output_line(line)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()  # type: ignore
+
+        output = "\n".join(last_lines)
+        logger.debug(f"Return code: {returncode}")
+        if timed_out.is_set():
+            return f"Error: command timed out after {self.timeout} seconds\n{output}"
+        if returncode != 0:
+            return f"Error: {output}"
+        return output
+
+    async def arun_shell_command(self, args: List[str], tail: int = 100) -> str:
+        """
+        Runs a shell command and returns the output or error.
+
+        Args:
+            args (List[str]): The command to run as a list of strings.
+            tail (int): The number of lines to return from the output, 0 for all of them.
+        Returns:
+            str: The output of the command.
+        """
+        from collections import deque
+
+        if tail < 0:
+            return f"Error: tail must be 0 or more, got {tail}"
+
+        # Wait for a free slot in the subprocess pool
+        queued_at = time.perf_counter()
+        self.subprocess_stats["queued"] += 1
+        try:
+            await self._subprocess_slots.acquire()
+        finally:
+            # Also when the run is cancelled while it waits
+            self.subprocess_stats["queued"] -= 1
+        try:
+            wait_seconds = time.perf_counter() - queued_at
+            self.subprocess_stats["running"] += 1
+            self.subprocess_stats["total_wait_seconds"] += wait_seconds
+            self.subprocess_stats["max_wait_seconds"] = max(self.subprocess_stats["max_wait_seconds"], wait_seconds)
+            try:
+                logger.info(f"Running shell command: {args}")
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *args,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT,
+                        cwd=self.working_directory,
+                        # Own process group, so a timeout also kills the command's children
+                        start_new_session=True,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to run shell command: {e}")
+                    return f"Error: {e}"
+
+                # Keep only the last `tail` lines in memory
+                last_lines: deque = deque(maxlen=tail or None)
+
+                async def read_output() -> None:
+                    pending = ""
+                    while chunk := await process.stdout.read(64 * 1024):  # type: ignore
+                        pending += chunk.decode(errors="replace")
+                        *lines, pending = pending.split("\n")
+                        # Flush a huge line without newlines instead of growing the buffer
+                        if len(pending) >= 64 * 1024:
+                            lines.append(pending)
+                            pending = ""
+                        for line in lines:
+                            last_lines.append(line)
+                            if self.on_output_line is not None:
+                                self.on_output_line(line)
+                    if pending:
+                        last_lines.append(pending)
+                        if self.on_output_line is not None:
+                            self.on_output_line(pending)
+
+                try:
+                    await asyncio.wait_for(read_output(), timeout=self.timeout)
+                    returncode = await process.wait()
+                except asyncio.TimeoutError:
+                    try:
+                        os.killpg(process.pid, signal.SIGKILL)
+                    except (AttributeError, OSError):
+                        process.kill()
+                    await process.wait()
+                    return f"Error: command timed out after {self.timeout} seconds\n" + "\n".join(last_lines)
+
+                output = "\n".join(last_lines)
+                logger.debug(f"Return code: {returncode}")
+                if returncode != 0:
+                    return f"Error: {output}"
+                return output
+            finally:
+                self.subprocess_stats["running"] -= 1
+                self.subprocess_stats["completed"] += 1
+        finally:
+            self._subprocess_slots.release()
+
 agent = Agent(tools=[ShellTools()], markdown=True, debug_mode=True)
-agent.print_response("List all the files in my home directory.")
\ No newline at end of file
+
+# Sync usage - uses run_shell_command
+agent.print_response("List all the files in my home directory.")
+
+# Async usage - uses arun_shell_command automatically, running commands in the subprocess pool
+asyncio.run(agent.aprint_response("Show the disk usage of my home directory."))
\ No newline at end of file
@@ -1,7 +1,11 @@
-from typing import Any, Dict
+import asyncio
+import threading
+from importlib.util import find_spec
+from typing import Any, Dict, Optional
 
 from agno.agent import Agent
-from agno.tools import Toolkit
+
+from toolkit_schemas import CachedSchemaToolkit
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -12,11 +16,25 @@ except ImportError:
     raise ImportError("`httpx` not installed. Run `uv pip install httpx`")
 
 
-class APITools(Toolkit):
-    def __init__(self, base_url: str, timeout: float = 30.0, **kwargs):
+class APITools(CachedSchemaToolkit):
+    def __init__(self, base_url: str, timeout: float = 30.0, max_connections: int = 20, **kwargs):
         self.base_url = base_url
         self.timeout = timeout
 
+        # Connection pool shared by all tool calls, keeping connections alive between calls
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=30.0,
+        )
+        # HTTP/2 needs the optional `h2` package (`uv pip install 'httpx[http2]'`)
+        self.http2 = find_spec("h2") is not None
+
+        # Clients are created on first use and closed with close() / aclose()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._client_lock = threading.Lock()
+
         # Sync tools for agent.run() and agent.print_response()
         tools = [
             self.fetch_data,
@@ -32,6 +50,39 @@ class APITools(Toolkit):
 
         super().__init__(name="api_tools", tools=tools, async_tools=async_tools, **kwargs)
 
+    @property
+    def client(self) -> httpx.Client:
+        """The pooled sync client, created on first use and shared by concurrent tool calls."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        base_url=self.base_url, timeout=self.timeout, limits=self.limits, http2=self.http2
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The pooled async client, created on first use in the running event loop."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits, http2=self.http2
+            )
+        return self._async_client
+
+    def close(self) -> None:
+        """Close the pooled sync client."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close both pooled clients. Call this when the agent shuts down."""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     # Sync methods
     def fetch_data(self, endpoint: str) -> Dict[str, Any]:
         """
@@ -42,11 +93,9 @@ class APITools(Toolkit):
         Returns:
             The JSON response from the API
         """
-        url = f"{self.base_url}{endpoint}"
-        with httpx.Client(timeout=self.timeout) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            return response.json()
+        response = self.client.get(endpoint)
+        response.raise_for_status()
+        return response.json()
 
     def post_data(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -58,11 +107,9 @@ class APITools(Toolkit):
         Returns:
             The JSON response from the API
         """
-        url = f"{self.base_url}{endpoint}"
-        with httpx.Client(timeout=self.timeout) as client:
-            response = client.post(url, json=data)
-            response.raise_for_status()
-            return response.json()
+        response = self.client.post(endpoint, json=data)
+        response.raise_for_status()
+        return response.json()
 
     # Async methods (used automatically in async contexts)
     async def afetch_data(self, endpoint: str) -> Dict[str, Any]:
@@ -74,11 +121,9 @@ class APITools(Toolkit):
         Returns:
             The JSON response from the API
         """
-        url = f"{self.base_url}{endpoint}"
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.json()
+        response = await self.async_client.get(endpoint)
+        response.raise_for_status()
+        return response.json()
 
     async def apost_data(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -90,18 +135,25 @@ class APITools(Toolkit):
         Returns:
             The JSON response from the API
         """
-        url = f"{self.base_url}{endpoint}"
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, json=data)
-            response.raise_for_status()
-            return response.json()
+        response = await self.async_client.post(endpoint, json=data)
+        response.raise_for_status()
+        return response.json()
 
 # Create the agent with the toolkit (using JSONPlaceholder - a free fake API for testing)
-agent = Agent(tools=[APITools(base_url="https://jsonplaceholder.typicode.com")], markdown=True)
+api_tools = APITools(base_url="https://jsonplaceholder.typicode.com")
+agent = Agent(tools=[api_tools], markdown=True)
 
 # Sync usage - uses fetch_data
 agent.print_response("Fetch the user with ID 1")
 
-# Async usage - uses afetch_data automatically
-import asyncio
-asyncio.run(agent.aprint_response("Fetch the post with ID 1"))
\ No newline at end of file
+
+async def main():
+    try:
+        # Async usage - uses afetch_data automatically
+        await agent.aprint_response("Fetch the post with ID 1")
+    finally:
+        # Close the connection pools when the agent is done
+        await api_tools.aclose()
+
+
+asyncio.run(main())
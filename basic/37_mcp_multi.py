@@ -1,45 +1,146 @@
 import asyncio
+import hashlib
+import json
 import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from agno.agent import Agent
-from agno.tools.mcp import MultiMCPTools
+from agno.tools import Toolkit
+from agno.tools.function import Function
+from agno.utils.log import logger
+from mcp_session_pool import mcp_pool
+
+# The MCP servers used by this agent, shared across runs through the session pool
+MCP_COMMANDS = [
+    "npx -y @openbnb/mcp-server-airbnb --ignore-robots-txt",
+    "npx -y @modelcontextprotocol/server-google-maps",
+]
+MCP_ENV = {
+    **os.environ,
+    "GOOGLE_MAPS_API_KEY": os.getenv("GOOGLE_MAPS_API_KEY"),
+}
+
+
+class LazyMultiMCPTools(Toolkit):
+    """
+    Like MultiMCPTools, but each server is only started on the first call to one of its tools.
+
+    Tool listings are cached on disk per server command (pin versions in the command, e.g.
+    `pkg@1.2.3`), so the agent can register every schema without starting any server.
+    """
+
+    def __init__(
+        self,
+        commands: List[str],
+        env: Optional[Dict[str, Any]] = None,
+        cache_dir: str = "/tmp/agno_cache/mcp_tools",
+        # Unpinned `npx -y` servers may change, so listings also expire
+        cache_ttl: int = 24 * 3600,
+        **kwargs,
+    ):
+        super().__init__(name="lazy_multi_mcp_tools", **kwargs)
+        self.commands = commands
+        self.env = env
+        self.cache_dir = Path(cache_dir)
+        self.cache_ttl = cache_ttl
+        self.missing_listings: List[str] = []
+
+        for command in commands:
+            listing = self._read_listing(command)
+            if listing is None:
+                self.missing_listings.append(command)
+            else:
+                self._register(command, listing)
+
+    def _listing_path(self, command: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(command.encode()).hexdigest()}.json"
+
+    def _read_listing(self, command: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._listing_path(command)
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_ttl:
+                return None
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_listing(self, command: str, listing: List[Dict[str, Any]]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._listing_path(command).write_text(json.dumps(listing))
+
+    def _register(self, command: str, listing: List[Dict[str, Any]]) -> None:
+        for tool in listing:
+            self.functions[tool["name"]] = Function(
+                name=tool["name"],
+                description=tool["description"],
+                parameters=tool["parameters"],
+                entrypoint=self._lazy_entrypoint(command, tool["name"]),
+                skip_entrypoint_processing=True,
+            )
+
+    async def _connected_listing(self, command: str) -> List[Dict[str, Any]]:
+        """Start (or reuse) the server and refresh its cached listing."""
+        async with mcp_pool.session(command=command, env=self.env) as mcp_tools:
+            listing = [
+                {"name": f.name, "description": f.description, "parameters": f.parameters}
+                for f in mcp_tools.functions.values()
+            ]
+        if listing != self._read_listing(command):
+            self._write_listing(command, listing)
+        return listing
+
+    def _lazy_entrypoint(self, command: str, tool_name: str):
+        async def call_tool(**kwargs):
+            # The first call starts this server, later calls reuse the pooled session
+            async with mcp_pool.session(command=command, env=self.env) as mcp_tools:
+                function = mcp_tools.functions.get(tool_name)
+                if function is None:
+                    # The server changed since its listing was cached
+                    self._register(command, await self._connected_listing(command))
+                    return f"Error: tool '{tool_name}' is no longer provided by the MCP server"
+                return await function.entrypoint(**kwargs)  # type: ignore
+
+        return call_tool
+
+    async def build_tools(self) -> None:
+        """List the tools of servers that have no cached listing yet."""
+        for command in self.missing_listings:
+            try:
+                self._register(command, await self._connected_listing(command))
+            except Exception as e:
+                logger.warning(f"Failed to list tools for {command}: {e}")
+        self.missing_listings = []
+
+
+# Registers cached schemas only, no server is started here
+mcp_tools = LazyMultiMCPTools(commands=MCP_COMMANDS, env=MCP_ENV)
 
 
 async def run_agent(message: str) -> None:
     """Run the Airbnb and Google Maps agent with the given message."""
 
-    env = {
-        **os.environ,
-        "GOOGLE_MAPS_API_KEY": os.getenv("GOOGLE_MAPS_API_KEY"),
-    }
-
-    # Initialize and connect to multiple MCP servers
-    mcp_tools = MultiMCPTools(
-        commands=[
-            "npx -y @openbnb/mcp-server-airbnb --ignore-robots-txt",
-            "npx -y @modelcontextprotocol/server-google-maps",
-        ],
-        env=env,
+    agent = Agent(
+        tools=[mcp_tools],
+        markdown=True,
     )
-    await mcp_tools.connect()
 
+    await agent.aprint_response(message, stream=True)
+
+
+async def main() -> None:
+    # Only starts servers on the very first run, when no listing is cached
+    await mcp_tools.build_tools()
     try:
-        agent = Agent(
-            tools=[mcp_tools],
-            markdown=True,
+        await run_agent(
+            "What listings are available in Cape Town for 2 people for 3 nights from 1 to 4 August 2025?"
         )
-
-        await agent.aprint_response(message, stream=True)
     finally:
-        # Always close the connection when done
-        await mcp_tools.close()
+        await mcp_pool.close()
 
 
 # Example usage
 if __name__ == "__main__":
     # Pull request example
-    asyncio.run(
-        run_agent(
-            "What listings are available in Cape Town for 2 people for 3 nights from 1 to 4 August 2025?"
-        )
-    )
\ No newline at end of file
+    asyncio.run(main())
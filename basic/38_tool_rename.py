@@ -1,24 +1,65 @@
 import asyncio
 
 from agno.agent import Agent
-from agno.tools.mcp import MCPTools
+from agno.models.openai import OpenAIResponses
+from agno.utils.log import logger
+from mcp_session_pool import mcp_pool
 
+# Development environment tools
+DEV_SERVER = {
+    "transport": "streamable-http",
+    "url": "https://docs.agno.com/mcp",
+    # By providing this tool_name_prefix, all the tool names will be prefixed with "dev_"
+    "tool_name_prefix": "dev",
+}
 
-async def run_agent():
-    # Development environment tools
-    dev_tools = MCPTools(
-        transport="streamable-http",
-        url="https://docs.agno.com/mcp",
-        # By providing this tool_name_prefix, all the tool names will be prefixed with "dev_"
-        tool_name_prefix="dev",
-    )
-    await dev_tools.connect()
 
-    agent = Agent(tools=[dev_tools])
-    await agent.aprint_response("Which tools do you have access to? List them all.")
+def mcp_call_limits_hook(max_in_flight: int = 8, call_timeout: float = 30.0):
+    """
+    Tool hook bounding the calls in flight against one MCP endpoint, with a timeout per call.
 
-    await dev_tools.close()
+    The MCP session multiplexes concurrent requests, so parallel tool calls and several agents
+    can share it; the limit only protects the endpoint from unbounded fan-out.
+    """
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def limit_mcp_calls(function_name: str, function_call, arguments: dict):
+        async with in_flight:
+            try:
+                return await asyncio.wait_for(function_call(**arguments), timeout=call_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"MCP tool {function_name} timed out after {call_timeout} seconds")
+                return f"Error: {function_name} timed out after {call_timeout} seconds"
+
+    return limit_mcp_calls
+
+
+# One limit per endpoint, shared by every agent using it
+dev_call_limits = mcp_call_limits_hook(max_in_flight=8, call_timeout=30.0)
+
+
+async def run_agent(message: str):
+    # Reuse the pooled session instead of connecting and closing per run
+    async with mcp_pool.session(**DEV_SERVER) as dev_tools:
+        agent = Agent(
+            model=OpenAIResponses(id="gpt-5.2", parallel_tool_calls=True),
+            tools=[dev_tools],
+            tool_hooks=[dev_call_limits],
+        )
+        await agent.aprint_response(message)
+
+
+async def main():
+    await mcp_pool.warm_up([DEV_SERVER])
+    try:
+        # Both agents share one session, their tool calls are multiplexed over it
+        await asyncio.gather(
+            run_agent("Which tools do you have access to? List them all."),
+            run_agent("Search the docs for how to add tool hooks and for how to use MCP tools."),
+        )
+    finally:
+        await mcp_pool.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(run_agent())
\ No newline at end of file
+    asyncio.run(main())
@@ -1,41 +1,131 @@
 import asyncio
+import hashlib
+import json
 import os
+import time
 from textwrap import dedent
+from typing import Any, Dict, Optional, Tuple
 
+import httpx
 from agno.agent import Agent
 from agno.models.openai import OpenAIResponses
-from agno.tools.mcp import MCPTools
+from agno.utils.log import logger
+from mcp_session_pool import mcp_pool
 
 from dotenv import load_dotenv
 load_dotenv()
 
 
-async def run_agent(message: str) -> None:
+# Use npx to run the browserbase MCP server directly
+BROWSERBASE_SERVER = {
+    "command": "npx @browserbasehq/mcp-server-browserbase",
     # Environment variables for browserbase MCP server
-    env = {
+    "env": {
         **os.environ,
         "BROWSERBASE_API_KEY": os.getenv("BROWSERBASE_API_KEY"),
         "BROWSERBASE_PROJECT_ID": os.getenv("BROWSERBASE_PROJECT_ID"),
-    }
+    },
+    "timeout_seconds": 60,
+}
 
-    # Use npx to run the browserbase MCP server directly
-    mcp_tools = MCPTools(
-        command="npx @browserbasehq/mcp-server-browserbase",
-        env=env,
-        timeout_seconds=60,
-    )
-    await mcp_tools.connect()
 
-    try:
+class BrowserSnapshotCache:
+    """
+    Tool hook that keeps the pooled browser page warm between runs and caches `stagehand_extract`
+    results keyed by URL + DOM hash + arguments, for `ttl` seconds.
+
+    Navigating to the page that is already open is skipped while its HTML hash is unchanged, and
+    extractions from an unchanged page return the cached result instead of running the browser again.
+    Call `use(tools)` with every leased toolkit, so a reconnected or reaped browser session, which
+    has no page open, is never taken for the old one.
+    """
+
+    # Tools that read the page without changing it
+    READ_ONLY_TOOLS = {"stagehand_extract", "stagehand_observe", "screenshot"}
+
+    def __init__(self, ttl: float = 120.0):
+        self.ttl = ttl
+        self.current_url: Optional[str] = None
+        self._page_hash: Optional[str] = None
+        # The browser session the open page belongs to
+        self._tools: Any = None
+        self._snapshots: Dict[Tuple[str, str, str], Tuple[float, Any]] = {}
+        self._http = httpx.AsyncClient(timeout=10.0, follow_redirects=True)
+        self.stats = {"navigations_skipped": 0, "hits": 0, "misses": 0}
+
+    def use(self, tools: Any) -> None:
+        if tools is not self._tools:
+            self._tools = tools
+            self.current_url = self._page_hash = None
+
+    async def dom_hash(self, url: str) -> str:
+        # The server-rendered HTML is a cheap proxy for the page the browser would extract from
+        response = await self._http.get(url)
+        return hashlib.sha256(response.content).hexdigest()
+
+    async def _safe_dom_hash(self, url: str) -> Optional[str]:
+        try:
+            return await self.dom_hash(url)
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to hash {url}: {e}")
+            return None
+
+    async def hook(self, function_name: str, function_call, arguments: Dict[str, Any]):
+        if function_name == "stagehand_navigate":
+            url = arguments.get("url")
+            page_hash = await self._safe_dom_hash(url) if url else None
+            # Reuse the open page only while its content is unchanged
+            if url == self.current_url and page_hash is not None and page_hash == self._page_hash:
+                self.stats["navigations_skipped"] += 1
+                return f"Navigated to {url} (page already open)"
+            result = await function_call(**arguments)
+            self.current_url, self._page_hash = url, page_hash
+            return result
+
+        if function_name != "stagehand_extract" or self._page_hash is None:
+            if function_name not in self.READ_ONLY_TOOLS:
+                # Clicks and other actions may leave the current page
+                self.current_url = self._page_hash = None
+            return await function_call(**arguments)
+
+        key = (self.current_url, self._page_hash, json.dumps(arguments, sort_keys=True))
+
+        cached = self._snapshots.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self.stats["hits"] += 1
+            return cached[1]
+
+        self.stats["misses"] += 1
+        result = await function_call(**arguments)
+        now = time.monotonic()
+        # Drop expired snapshots so the cache stays small
+        self._snapshots = {k: v for k, v in self._snapshots.items() if now - v[0] < self.ttl}
+        self._snapshots[key] = (now, result)
+        return result
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+# Shared with the pooled browser session, so it outlives single runs
+browser_cache = BrowserSnapshotCache(ttl=120.0)
+
+
+async def run_agent(message: str) -> None:
+    # Lease the pooled browserbase session, started once per process
+    async with mcp_pool.session(**BROWSERBASE_SERVER) as mcp_tools:
+        # A new session (after a reconnect or an idle reap) starts without the page open
+        browser_cache.use(mcp_tools)
         agent = Agent(
             model=OpenAIResponses(id="gpt-5.2"),
             tools=[mcp_tools],
+            tool_hooks=[browser_cache.hook],
             instructions=dedent("""\
                 You are a web scraping assistant that creates concise reader's digests from Hacker News.
 
                 CRITICAL INITIALIZATION RULES - FOLLOW EXACTLY:
                 1. NEVER use screenshot tool until AFTER successful navigation
-                2. ALWAYS start with stagehand_navigate first
+                2. ALWAYS start with stagehand_navigate first (the page may already be open, then it returns at once)
                 3. Wait for navigation success message before any other actions
                 4. If you see initialization errors, restart with navigation only
                 5. Use stagehand_observe and stagehand_extract to explore pages safely
@@ -59,14 +149,19 @@ async def run_agent(message: str) -> None:
             debug_mode=True,
         )
         await agent.aprint_response(message, stream=True)
-    finally:
-        # Always close the connection when done
-        await mcp_tools.close()
 
 
-if __name__ == "__main__":
-    asyncio.run(
-        run_agent(
+async def main() -> None:
+    await mcp_pool.warm_up([BROWSERBASE_SERVER])
+    try:
+        await run_agent(
             "Create a comprehensive Hacker News Reader's Digest from https://news.ycombinator.com"
         )
-    )
\ No newline at end of file
+    finally:
+        print(browser_cache.stats)
+        await browser_cache.aclose()
+        await mcp_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
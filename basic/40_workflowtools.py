@@ -2,7 +2,8 @@ import asyncio
 from textwrap import dedent
 
 from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
+from async_db import ExecutorDb
+from sqlite_store import DeltaSqliteDb
 from agno.models.openai import OpenAIResponses
 from agno.team import Team
 from agno.tools.duckduckgo import DuckDuckGoTools
@@ -96,9 +97,12 @@ research_team = Team(
 content_creation_workflow = Workflow(
     name="Blog Post Workflow",
     description="Automated blog post creation from Hackernews and the web",
-    db=SqliteDb(
-        session_table="workflow_session",
-        db_file="tmp/workflow.db",
+    # The workflow only runs async here, so its sync db is offloaded to keep the event loop free
+    db=ExecutorDb(
+        DeltaSqliteDb(
+            session_table="workflow_session",
+            db_file="tmp/workflow.db",
+        )
     ),
     steps=[
         prepare_input_for_web_search,
@@ -0,0 +1,121 @@
+"""
+Async facade for sync databases, so async runs never block the event loop on storage.
+
+Agents, teams and workflows call a sync db (`SqliteDb`, `PostgresDb`, `JsonDb`, the stores in
+`sqlite_store.py`...) directly from `arun` / `aprint_response`, which stalls every other coroutine
+for the duration of each query and fsync. When a native async driver exists, prefer it
+(`AsyncSqliteDb` on aiosqlite, `AsyncPostgresDb` on psycopg's async pool). Otherwise wrap the sync
+db in `ExecutorDb`: agno sees an async db and awaits it, and every call runs on a dedicated
+thread pool.
+
+Run this file directly for an event loop lag benchmark.
+"""
+
+import asyncio
+from abc import update_abstractmethods
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from agno.db.base import AsyncBaseDb, BaseDb
+
+
+class ExecutorDb(AsyncBaseDb):
+    """AsyncBaseDb that runs every call of the wrapped sync db on its own thread pool."""
+
+    def __init__(self, db: BaseDb, max_workers: int = 4):
+        super().__init__(
+            id=db.id,
+            session_table=db.session_table_name,
+            memory_table=db.memory_table_name,
+            metrics_table=db.metrics_table_name,
+            eval_table=db.eval_table_name,
+            knowledge_table=db.knowledge_table_name,
+            traces_table=db.trace_table_name,
+            spans_table=db.span_table_name,
+            culture_table=db.culture_table_name,
+            versions_table=db.versions_table_name,
+            learnings_table=db.learnings_table_name,
+        )
+        self.db = db
+        # Dedicated pool, so slow storage never starves the default executor used by sync tools
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def _offload(self, method: str, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(getattr(self.db, method), *args, **kwargs))
+
+    async def close(self) -> None:
+        await self._offload("close")
+        self._executor.shutdown(wait=True)
+
+    def __getattr__(self, name: str) -> Any:
+        # Plain attributes (db_file, db_engine...) come from the wrapped db
+        if name == "db":
+            raise AttributeError(name)
+        return getattr(self.db, name)
+
+
+def _offloaded(method: str):
+    async def call(self: ExecutorDb, *args, **kwargs):
+        return await self._offload(method, *args, **kwargs)
+
+    call.__name__ = method
+    return call
+
+
+# Implement the whole async db interface by offloading to the sync method of the same name
+for _method in AsyncBaseDb.__abstractmethods__ | {"upsert_sessions", "upsert_memories"}:
+    setattr(ExecutorDb, _method, _offloaded(_method))
+update_abstractmethods(ExecutorDb)
+
+
+async def benchmark_loop_lag(num_sessions: int = 200) -> None:
+    """Worst event loop stall while sessions are saved and read, sync db vs ExecutorDb."""
+    import tempfile
+    import time
+
+    from agno.db.base import SessionType
+    from agno.db.sqlite import SqliteDb
+    from agno.session import AgentSession
+
+    async def measure(save_and_read) -> float:
+        max_lag = 0.0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal max_lag
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                max_lag = max(max_lag, time.perf_counter() - start - 0.001)
+
+        ticker_task = asyncio.create_task(ticker())
+        await asyncio.sleep(0.01)
+        for i in range(num_sessions):
+            await save_and_read(AgentSession(session_id=f"session-{i}", agent_id="benchmark", created_at=int(time.time())))
+        done.set()
+        await ticker_task
+        return max_lag
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_db = SqliteDb(db_file=f"{tmp}/sync.db")
+
+        async def sync_save_and_read(session: AgentSession) -> None:
+            # What agno does with a sync db inside arun
+            sync_db.upsert_session(session)
+            sync_db.get_session(session.session_id, SessionType.AGENT)
+
+        executor_db = ExecutorDb(SqliteDb(db_file=f"{tmp}/executor.db"))
+
+        async def executor_save_and_read(session: AgentSession) -> None:
+            await executor_db.upsert_session(session)
+            await executor_db.get_session(session.session_id, SessionType.AGENT)
+
+        print(f"sync db:     max loop lag {await measure(sync_save_and_read) * 1000:.1f} ms")
+        print(f"ExecutorDb:  max loop lag {await measure(executor_save_and_read) * 1000:.1f} ms")
+        await executor_db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_loop_lag())
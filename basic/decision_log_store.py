@@ -0,0 +1,418 @@
+"""
+Decision logs in a dedicated, indexed table, with full-text search and paginated queries.
+
+The stock `DecisionLogStore` keeps decisions as JSON in the learnings table, and every search
+loads a batch of them and filters in Python (by session, type, time and substring), so an audit
+over a large log means loading all of it. `IndexedDecisionLogStore` writes each decision as a row
+of `decision_logs`, in the agent's SQLite or Postgres db:
+    - indexes on (agent_id, created_ts), (session_id, created_ts) and created_ts
+    - a full-text index over decision, reasoning and context (FTS5 on SQLite, a GIN tsvector
+      index on Postgres)
+    - `query()` returns one page and a cursor for the next one (keyset pagination, so page 10 000
+      costs the same as page 1), and `stream()` walks every match page by page in constant memory
+
+`search()`, `get()` and `print()` keep the stock signatures, so the agent tools use the index too.
+Run this file directly to benchmark queries over a large log.
+"""
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agno.learn.schemas import DecisionLog
+from agno.learn.stores import DecisionLogStore
+from agno.learn.utils import from_dict_safe, to_dict_safe
+from agno.utils.log import log_debug
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.engine import Engine
+
+COLUMNS = ["id", "agent_id", "session_id", "user_id", "team_id", "decision_type", "created_ts", "decision", "reasoning", "context", "content"]
+
+
+@dataclass
+class DecisionPage:
+    decisions: List[DecisionLog]
+    # Pass back to `query(cursor=...)` for the next page, None on the last one
+    next_cursor: Optional[str]
+
+
+def _timestamp(value: Optional[str]) -> float:
+    if not value:
+        return time.time()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return time.time()
+    # DecisionLog timestamps are naive UTC
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+@dataclass
+class IndexedDecisionLogStore(DecisionLogStore):
+    """DecisionLogStore backed by an indexed `decision_logs` table with full-text search."""
+
+    table_name: str = "decision_logs"
+
+    _ready: bool = field(default=False, init=False, repr=False)
+
+    @property
+    def engine(self) -> Engine:
+        return self.db.db_engine  # type: ignore
+
+    @property
+    def _postgres(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    @property
+    def _table(self) -> str:
+        schema = getattr(self.db, "db_schema", None)
+        return f"{schema}.{self.table_name}" if self._postgres and schema else self.table_name
+
+    def _create_table(self) -> None:
+        if self._ready:
+            return
+        table, name = self._table, self.table_name
+        statements = [f"CREATE SCHEMA IF NOT EXISTS {self.db.db_schema}"] if self._postgres else []  # type: ignore
+        statements += [
+            f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, agent_id TEXT, session_id TEXT, "
+            "user_id TEXT, team_id TEXT, decision_type TEXT, created_ts DOUBLE PRECISION NOT NULL, "
+            "decision TEXT NOT NULL, reasoning TEXT, context TEXT, content TEXT NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS ix_{name}_agent ON {table} (agent_id, created_ts, id)",
+            f"CREATE INDEX IF NOT EXISTS ix_{name}_session ON {table} (session_id, created_ts, id)",
+            f"CREATE INDEX IF NOT EXISTS ix_{name}_created ON {table} (created_ts, id)",
+        ]
+        if self._postgres:
+            statements += [
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search tsvector GENERATED ALWAYS AS (to_tsvector("
+                "'english', coalesce(decision, '') || ' ' || coalesce(reasoning, '') || ' ' || coalesce(context, '')"
+                ")) STORED",
+                f"CREATE INDEX IF NOT EXISTS ix_{name}_search ON {table} USING GIN (search)",
+            ]
+        else:
+            # External content FTS5 table, kept in sync by triggers
+            fts = f"{name}_fts"
+            new = "new.rowid, new.decision, new.reasoning, new.context"
+            old = f"'delete', old.rowid, old.decision, old.reasoning, old.context"
+            statements += [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(decision, reasoning, context, "
+                f"content='{name}', content_rowid='rowid')",
+                f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {name} BEGIN "
+                f"INSERT INTO {fts} (rowid, decision, reasoning, context) VALUES ({new}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {name} BEGIN "
+                f"INSERT INTO {fts} ({fts}, rowid, decision, reasoning, context) VALUES ({old}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {name} BEGIN "
+                f"INSERT INTO {fts} ({fts}, rowid, decision, reasoning, context) VALUES ({old}); "
+                f"INSERT INTO {fts} (rowid, decision, reasoning, context) VALUES ({new}); END",
+            ]
+        with self.engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+        self._ready = True
+
+    @staticmethod
+    def _row(decision: DecisionLog) -> Dict[str, Any]:
+        return {
+            "id": decision.id,
+            "agent_id": decision.agent_id,
+            "session_id": decision.session_id,
+            "user_id": decision.user_id,
+            "team_id": decision.team_id,
+            "decision_type": decision.decision_type,
+            "created_ts": _timestamp(decision.created_at),
+            "decision": decision.decision,
+            "reasoning": decision.reasoning,
+            "context": decision.context,
+            "content": json.dumps(to_dict_safe(decision), default=str),
+        }
+
+    def save_many(self, decisions: List[DecisionLog]) -> None:
+        """Insert or update decisions in one transaction."""
+        if not self.db or not decisions:
+            return
+        self._create_table()
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c not in ("id", "created_ts"))
+        statement = text(
+            f"INSERT INTO {self._table} ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        )
+        with self.engine.begin() as conn:
+            conn.execute(statement, [self._row(decision) for decision in decisions])
+        self.decisions_updated = True
+
+    def save(self, decision: DecisionLog) -> None:
+        try:
+            self.save_many([decision])
+            log_debug(f"IndexedDecisionLogStore.save: saved decision {decision.id}")
+        except Exception as e:
+            log_debug(f"IndexedDecisionLogStore.save failed: {e}")
+
+    def _where(
+        self,
+        agent_id: Optional[str],
+        session_id: Optional[str],
+        user_id: Optional[str],
+        decision_type: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        text_query: Optional[str],
+        common_terms: bool = False,
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        clauses: List[str] = []
+        params: Dict[str, Any] = {}
+        for column, value in (
+            ("agent_id", agent_id),
+            ("session_id", session_id),
+            ("user_id", user_id),
+            ("decision_type", decision_type),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = :{column}")
+                params[column] = value
+        if since is not None:
+            clauses.append("created_ts >= :since")
+            params["since"] = since.timestamp()
+        if until is not None:
+            clauses.append("created_ts < :until")
+            params["until"] = until.timestamp()
+        if text_query:
+            if not self._fts_terms(text_query):
+                # No words to search for (e.g. only punctuation), so nothing matches
+                clauses.append("1 = 0")
+            elif self._postgres:
+                clauses.append("search @@ plainto_tsquery('english', :text_query)")
+                params["text_query"] = text_query
+            else:
+                # Rare terms: look up their rows. Common terms: `+rowid` stops SQLite from fetching
+                # every match, so it walks an index in created_ts order and stops after one page.
+                fts = f"{self.table_name}_fts"
+                rowid = "+rowid" if common_terms else "rowid"
+                clauses.append(f"{rowid} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH :text_query)")
+                params["text_query"] = self._fts_terms(text_query)
+        return clauses, params
+
+    @staticmethod
+    def _fts_terms(text_query: str) -> str:
+        # Quoted terms, so user input is never parsed as FTS5 syntax
+        return " ".join(f'"{word}"' for word in re.findall(r"\w+", text_query))
+
+    def _is_common(self, conn: Any, text_query: str, probe: int = 1000) -> bool:
+        if not self._fts_terms(text_query):
+            return False
+        fts = f"{self.table_name}_fts"
+        matches = conn.execute(
+            text(f"SELECT COUNT(*) FROM (SELECT 1 FROM {fts} WHERE {fts} MATCH :text_query LIMIT {probe})"),
+            {"text_query": self._fts_terms(text_query)},
+        ).scalar_one()
+        return matches >= probe
+
+    def query(
+        self,
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        decision_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        text_query: Optional[str] = None,
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+    ) -> DecisionPage:
+        """One page of matching decisions, newest first. Pass `next_cursor` back for the next page."""
+        if not self.db:
+            return DecisionPage([], None)
+        self._create_table()
+        with self.engine.connect() as conn:
+            common_terms = bool(text_query) and not self._postgres and self._is_common(conn, text_query)  # type: ignore
+            clauses, params = self._where(
+                agent_id, session_id, user_id, decision_type, since, until, text_query, common_terms
+            )
+            if cursor is not None:
+                cursor_ts, cursor_id = cursor.split(":", 1)
+                # Keyset pagination: continue after the last row instead of skipping OFFSET rows
+                clauses.append("(created_ts < :cursor_ts OR (created_ts = :cursor_ts AND id < :cursor_id))")
+                params.update(cursor_ts=float(cursor_ts), cursor_id=cursor_id)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            params["limit"] = page_size + 1
+            rows = conn.execute(
+                text(
+                    f"SELECT id, created_ts, content FROM {self._table} {where} "
+                    "ORDER BY created_ts DESC, id DESC LIMIT :limit"
+                ),
+                params,
+            ).fetchall()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = f"{rows[-1].created_ts!r}:{rows[-1].id}"
+        decisions = [from_dict_safe(DecisionLog, json.loads(row.content)) for row in rows]
+        return DecisionPage([d for d in decisions if d is not None], next_cursor)
+
+    def stream(self, page_size: int = 500, **filters: Any) -> Iterator[DecisionLog]:
+        """Every matching decision, newest first, fetched page by page. Takes the filters of `query`."""
+        cursor = None
+        while True:
+            page = self.query(page_size=page_size, cursor=cursor, **filters)
+            yield from page.decisions
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def count(
+        self,
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        decision_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        text_query: Optional[str] = None,
+    ) -> int:
+        """Number of matching decisions."""
+        if not self.db:
+            return 0
+        self._create_table()
+        clauses, params = self._where(agent_id, session_id, user_id, decision_type, since, until, text_query)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {self._table} {where}"), params).scalar_one()
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        decision_type: Optional[str] = None,
+        days: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[DecisionLog]:
+        try:
+            return self.query(
+                agent_id=agent_id,
+                session_id=session_id,
+                decision_type=decision_type,
+                since=datetime.now(timezone.utc) - timedelta(days=days) if days else None,
+                text_query=query,
+                page_size=limit,
+            ).decisions
+        except Exception as e:
+            log_debug(f"IndexedDecisionLogStore.search failed: {e}")
+            return []
+
+    async def asearch(self, *args, **kwargs) -> List[DecisionLog]:
+        return await asyncio.to_thread(self.search, *args, **kwargs)
+
+    def get(self, decision_id: str) -> Optional[DecisionLog]:
+        if not self.db:
+            return None
+        self._create_table()
+        with self.engine.connect() as conn:
+            content = conn.execute(
+                text(f"SELECT content FROM {self._table} WHERE id = :id"), {"id": decision_id}
+            ).scalar_one_or_none()
+        return from_dict_safe(DecisionLog, json.loads(content)) if content else None
+
+    async def aget(self, decision_id: str) -> Optional[DecisionLog]:
+        return await asyncio.to_thread(self.get, decision_id)
+
+    async def asave(self, decision: DecisionLog) -> None:
+        await asyncio.to_thread(self.save, decision)
+
+    def import_learnings(self, batch_size: int = 1000) -> int:
+        """
+        Copy decisions saved by the stock DecisionLogStore (in the learnings table) into the index.
+
+        Pages through the learnings table and skips decisions already in the index, so memory stays
+        flat and a re-run only writes what is new. Returns the number of decisions imported.
+        """
+        learnings = self.db._get_table(table_type="learnings")  # type: ignore
+        if learnings is None:
+            return 0
+        self._create_table()
+        existing_ids = text(f"SELECT id FROM {self._table} WHERE id IN :ids")
+        existing_ids = existing_ids.bindparams(bindparam("ids", expanding=True))
+        imported, last_id = 0, None
+        while True:
+            page = select(learnings.c.learning_id, learnings.c.content).where(
+                learnings.c.learning_type == self.learning_type
+            )
+            if last_id is not None:
+                page = page.where(learnings.c.learning_id > last_id)
+            with self.engine.connect() as conn:
+                rows = conn.execute(page.order_by(learnings.c.learning_id).limit(batch_size)).fetchall()
+                if not rows:
+                    return imported
+                last_id = rows[-1].learning_id
+                decisions = [from_dict_safe(DecisionLog, row.content) for row in rows]
+                decisions = [d for d in decisions if d is not None]
+                ids = [d.id for d in decisions]
+                known = set(conn.execute(existing_ids, {"ids": ids}).scalars()) if ids else set()
+            new = [d for d in decisions if d.id not in known]
+            self.save_many(new)  # type: ignore
+            imported += len(new)
+
+
+def benchmark(num_decisions: int = 200_000) -> None:
+    """Query latency over a large decision log, indexed store vs the stock learnings-table store."""
+    import random
+    import tempfile
+
+    from agno.db.sqlite import SqliteDb
+    from agno.learn import DecisionLogConfig
+
+    random.seed(0)
+    words = ["search", "cache", "retry", "escalate", "summarize", "clarify", "refund", "database", "timeout", "budget"]
+    start_ts = datetime(2025, 1, 1)
+
+    def make_decision(i: int) -> DecisionLog:
+        return DecisionLog(
+            id=f"dec_{i:08d}",
+            decision=f"Chose to {random.choice(words)} for request {i}",
+            reasoning=f"Because {' '.join(random.sample(words, 4))}",
+            decision_type=random.choice(["tool_selection", "response_style", "escalation"]),
+            agent_id=f"agent-{i % 10}",
+            session_id=f"session-{i // 20}",
+            created_at=(start_ts + timedelta(seconds=30 * i)).isoformat(),
+        )
+
+    def timed(label: str, fn) -> None:
+        start = time.perf_counter()
+        result = fn()
+        print(f"  {label:38} {(time.perf_counter() - start) * 1000:8.1f} ms  ({len(result)} results)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = IndexedDecisionLogStore(config=DecisionLogConfig(db=SqliteDb(db_file=f"{tmp}/indexed.db")))
+        start = time.perf_counter()
+        for i in range(0, num_decisions, 10_000):
+            store.save_many([make_decision(j) for j in range(i, min(i + 10_000, num_decisions))])
+        print(f"IndexedDecisionLogStore, {num_decisions} decisions ({time.perf_counter() - start:.1f}s to load)")
+
+        middle = start_ts + timedelta(seconds=15 * num_decisions)
+        timed("by session", lambda: store.query(session_id="session-4242", page_size=100).decisions)
+        timed("agent + 1h time range", lambda: store.query(agent_id="agent-3", since=middle, until=middle + timedelta(hours=1)).decisions)
+        timed("common keyword 'refund'", lambda: store.query(text_query="refund").decisions)
+        timed("rare keyword '4242'", lambda: store.query(text_query="4242").decisions)
+        cursor = None
+        for _ in range(200):
+            page = store.query(agent_id="agent-3", page_size=50, cursor=cursor)
+            cursor = page.next_cursor
+        timed("page 201 of agent-3", lambda: store.query(agent_id="agent-3", page_size=50, cursor=cursor).decisions)
+        timed("stream a whole session", lambda: list(store.stream(session_id="session-4242", page_size=5)))
+
+        # The stock store can only fetch decisions of an agent and filter them in Python
+        baseline_size = min(num_decisions, 5_000)
+        stock_db = SqliteDb(db_file=f"{tmp}/stock.db")
+        stock = DecisionLogStore(config=DecisionLogConfig(db=stock_db))
+        for i in range(baseline_size):
+            decision = make_decision(i)
+            stock_db.upsert_learning(id=decision.id, learning_type="decision_log", agent_id=decision.agent_id,
+                                     session_id=decision.session_id, content=to_dict_safe(decision))
+        print(f"DecisionLogStore, {baseline_size} decisions")
+        timed("keyword 'refund' (full scan)", lambda: stock.search(query="refund", limit=baseline_size))
+
+
+if __name__ == "__main__":
+    benchmark()
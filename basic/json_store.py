@@ -0,0 +1,357 @@
+"""
+Sharded, append-only session storage for JsonDb.
+
+`JsonDb` keeps every session in one JSON file that is read and rewritten whole on each upsert, so
+its cost grows with the number of sessions. `ShardedJsonDb` keeps the same on-disk spirit (plain
+JSON you can read) but:
+    - spreads sessions over shard files by a hash prefix of the session id
+    - appends a small session header and only new or still open runs as JSON lines
+    - keeps a compact index (session id -> header/run offsets, plus user id and filter fields)
+      in memory, persisted as an append-only index log
+    - compacts a shard once most of it is dead records, and the index log with it
+
+Sessions a plain JsonDb saved in `<session_table>.json` are read from there until their next
+upsert moves them to the shards; `get_sessions` only lists the moved ones.
+Memories, metrics, evals and the other tables are still handled by JsonDb.
+
+Run this file directly to benchmark it against JsonDb.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from agno.db.base import SessionType
+from agno.db.json import JsonDb
+from agno.db.json.utils import apply_sorting
+from agno.db.utils import CustomJSONEncoder
+from agno.session import AgentSession, TeamSession, WorkflowSession
+from agno.utils.log import log_debug
+
+Session = Union[AgentSession, TeamSession, WorkflowSession]
+SESSION_CLASSES = {SessionType.AGENT: AgentSession, SessionType.TEAM: TeamSession, SessionType.WORKFLOW: WorkflowSession}
+COMPONENT_ID_FIELDS = {SessionType.AGENT: "agent_id", SessionType.TEAM: "team_id", SessionType.WORKFLOW: "workflow_id"}
+
+
+class ShardedJsonDb(JsonDb):
+    """JsonDb whose sessions live in sharded JSON lines files, addressed through an index."""
+
+    OPEN_RUN_STATUSES = {"PENDING", "RUNNING", "PAUSED"}
+
+    def __init__(
+        self,
+        db_path: str,
+        num_shards: int = 256,
+        compact_min_bytes: int = 1024 * 1024,
+        **kwargs,
+    ):
+        super().__init__(db_path=db_path, **kwargs)
+        self.num_shards = num_shards
+        self.compact_min_bytes = compact_min_bytes
+        self.sessions_dir = self.db_path / self.session_table_name
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.sessions_dir / "index.jsonl"
+
+        # session_id -> {"meta": {...}, "header": [offset, length], "runs": {run_id: [offset, length, closed]}}
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_lines = 0
+        # Bytes still referenced by the index, per shard
+        self._live_bytes: Dict[str, int] = {}
+        # Compactions per shard: each one writes a new file, named after it
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._load_index()
+        # Sessions stored whole by a plain JsonDb
+        self._legacy_ids = {
+            session["session_id"]
+            for session in self._read_json_file(self.session_table_name, create_table_if_not_found=False)
+        }
+
+    # -- Index --
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "r") as f:
+            for line in f:
+                self._index_lines += 1
+                self._apply_index_entry(json.loads(line))
+        for entry in self._index.values():
+            self._count_live(entry, +1)
+
+    def _apply_index_entry(self, item: Dict[str, Any]) -> None:
+        if "g" in item:
+            self._generations = item["g"]
+            return
+        session_id = item["s"]
+        if item.get("deleted"):
+            self._index.pop(session_id, None)
+            return
+        entry = self._index.setdefault(session_id, {"meta": {}, "header": None, "runs": {}})
+        if "h" in item:
+            entry["header"], entry["meta"] = item["h"], item["m"]
+        for run_id, location in item.get("r", {}).items():
+            entry["runs"][run_id] = location
+
+    def _count_live(self, entry: Dict[str, Any], sign: int) -> None:
+        shard = self._shard(entry["meta"]["session_id"])
+        live = (entry["header"][1] if entry["header"] else 0) + sum(run[1] for run in entry["runs"].values())
+        self._live_bytes[shard] = self._live_bytes.get(shard, 0) + sign * live
+
+    def _append_index(self, items: List[Dict[str, Any]]) -> None:
+        with open(self.index_path, "a") as f:
+            f.writelines(json.dumps(item) + "\n" for item in items)
+        self._index_lines += len(items)
+        # The log only grows, so rewrite it once it is mostly superseded entries
+        if self._index_lines > 2 * len(self._index) + 1000:
+            self._rewrite_index()
+
+    def _rewrite_index(self) -> None:
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"g": self._generations}) + "\n")
+            for session_id, entry in self._index.items():
+                f.write(json.dumps({"s": session_id, "h": entry["header"], "m": entry["meta"], "r": entry["runs"]}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+        self._index_lines = len(self._index) + 1
+
+    # -- Shards --
+
+    def _shard(self, session_id: str) -> str:
+        digest = int(hashlib.sha1(session_id.encode()).hexdigest()[:8], 16)
+        return f"{digest % self.num_shards:03d}"
+
+    def _shard_path(self, shard: str, generation: Optional[int] = None) -> Path:
+        generation = self._generations.get(shard, 0) if generation is None else generation
+        return self.sessions_dir / (f"{shard}.{generation}.jsonl" if generation else f"{shard}.jsonl")
+
+    def _read_record(self, f, location: List[int]) -> Dict[str, Any]:
+        f.seek(location[0])
+        return json.loads(f.read(location[1]))
+
+    def _maybe_compact(self, shard: str) -> None:
+        path = self._shard_path(shard)
+        size = path.stat().st_size
+        if size < self.compact_min_bytes or size < 2 * self._live_bytes.get(shard, 0):
+            return
+
+        # Copy the live records into the shard's next file
+        log_debug(f"Compacting session shard {shard}: {size} bytes, {self._live_bytes.get(shard, 0)} live")
+        generation = self._generations.get(shard, 0) + 1
+        moves: List[Tuple[List[Any], int]] = []
+        with open(path, "rb") as src, open(self._shard_path(shard, generation), "wb") as dst:
+            for session_id, entry in self._index.items():
+                if self._shard(session_id) != shard:
+                    continue
+                for location in [entry["header"], *entry["runs"].values()]:
+                    src.seek(location[0])
+                    data = src.read(location[1])
+                    moves.append((location, dst.tell()))
+                    dst.write(data + b"\n")
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        # The index switches to the new file atomically, and only then is the old one removed: a crash
+        # at any point leaves an index whose offsets match the file it names
+        for location, offset in moves:
+            location[0] = offset
+        self._generations[shard] = generation
+        self._rewrite_index()
+        path.unlink()
+
+    # -- Sessions --
+
+    def upsert_session(
+        self, session: Session, deserialize: Optional[bool] = True
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        runs = session.runs or []
+        session_type = next(t for t, cls in SESSION_CLASSES.items() if isinstance(session, cls))
+
+        with self._lock:
+            entry = self._index.get(session.session_id)
+            now = int(time.time())
+            created_at = (entry["meta"]["created_at"] if entry else None) or session.created_at or now
+
+            # The header is the session without its runs, which are stored as separate records
+            header = replace(session, runs=None).to_dict()  # type: ignore
+            header.update(session_type=session_type.value, created_at=created_at, updated_at=now)
+
+            records: List[Tuple[Optional[str], bytes]] = [(None, json.dumps(header, cls=CustomJSONEncoder).encode())]
+            closed_flags: Dict[str, bool] = {}
+            for run in runs:
+                known = entry["runs"].get(run.run_id) if entry else None
+                # Closed runs are already on disk and do not change any more
+                if known is not None and known[2]:
+                    continue
+                status = getattr(run.status, "value", run.status)
+                closed_flags[run.run_id] = status not in self.OPEN_RUN_STATUSES
+                records.append((run.run_id, json.dumps(run.to_dict(), cls=CustomJSONEncoder).encode()))
+
+            shard = self._shard(session.session_id)
+            locations: Dict[Optional[str], List[Any]] = {}
+            with open(self._shard_path(shard), "ab") as f:
+                for run_id, data in records:
+                    locations[run_id] = [f.tell(), len(data)]
+                    f.write(data + b"\n")
+
+            if entry is not None:
+                self._count_live(entry, -1)
+            meta = {
+                "session_id": session.session_id,
+                "session_type": session_type.value,
+                "user_id": session.user_id,
+                "component_id": header.get(COMPONENT_ID_FIELDS[session_type]),
+                "session_name": (session.session_data or {}).get("session_name"),
+                "created_at": created_at,
+                "updated_at": now,
+            }
+            run_locations = {run_id: [*locations[run_id], closed] for run_id, closed in closed_flags.items()}
+            item = {"s": session.session_id, "h": locations[None], "m": meta, "r": run_locations}
+            self._apply_index_entry(item)
+            self._count_live(self._index[session.session_id], +1)
+            self._append_index([item])
+            self._maybe_compact(shard)
+
+        return session if deserialize else self._load(session.session_id)
+
+    def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._index.get(session_id)
+            if entry is None:
+                return None
+            with open(self._shard_path(self._shard(session_id)), "rb") as f:
+                session_dict = self._read_record(f, entry["header"])
+                runs = [self._read_record(f, location) for location in entry["runs"].values()]
+        session_dict["runs"] = runs or None
+        return session_dict
+
+    def get_session(
+        self,
+        session_id: str,
+        session_type: SessionType,
+        user_id: Optional[str] = None,
+        deserialize: Optional[bool] = True,
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        entry = self._index.get(session_id)
+        if entry is None and session_id in self._legacy_ids:
+            # Its next upsert writes every run it has to the shards
+            return super().get_session(session_id, session_type, user_id=user_id, deserialize=deserialize)
+        if entry is None or (user_id is not None and entry["meta"]["user_id"] != user_id):
+            return None
+        session_dict = self._load(session_id)
+        if session_dict is None or not deserialize:
+            return session_dict
+        return SESSION_CLASSES[session_type].from_dict(session_dict)
+
+    def get_sessions(
+        self,
+        session_type: Optional[SessionType] = None,
+        user_id: Optional[str] = None,
+        component_id: Optional[str] = None,
+        session_name: Optional[str] = None,
+        start_timestamp: Optional[int] = None,
+        end_timestamp: Optional[int] = None,
+        limit: Optional[int] = None,
+        page: Optional[int] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+        deserialize: Optional[bool] = True,
+    ) -> Union[List[Session], Tuple[List[Dict[str, Any]], int]]:
+        # Filter, sort and paginate on the index, then only load the page
+        session_type_value = session_type.value if isinstance(session_type, SessionType) else session_type
+        with self._lock:
+            metas = [
+                meta
+                for meta in (entry["meta"] for entry in self._index.values())
+                if (session_type_value is None or meta["session_type"] == session_type_value)
+                and (user_id is None or meta["user_id"] == user_id)
+                and (component_id is None or meta["component_id"] == component_id)
+                and (start_timestamp is None or meta["created_at"] >= start_timestamp)
+                and (end_timestamp is None or meta["created_at"] <= end_timestamp)
+                and (session_name is None or session_name.lower() in (meta["session_name"] or "").lower())
+            ]
+        total_count = len(metas)
+        metas = apply_sorting(metas, sort_by, sort_order)
+        if limit is not None:
+            start_idx = (page - 1) * limit if page is not None else 0
+            metas = metas[start_idx : start_idx + limit]
+
+        sessions = [session for session in (self._load(meta["session_id"]) for meta in metas) if session is not None]
+        if not deserialize:
+            return sessions, total_count
+        # Without a session_type, as in JsonDb, every type is listed
+        return [
+            SESSION_CLASSES[SessionType(session["session_type"])].from_dict(session)  # type: ignore
+            for session in sessions
+        ]
+
+    def rename_session(
+        self, session_id: str, session_type: SessionType, session_name: str, deserialize: Optional[bool] = True
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        session = self.get_session(session_id, session_type)
+        if session is None:
+            return None
+        session.session_data = {**(session.session_data or {}), "session_name": session_name}  # type: ignore
+        return self.upsert_session(session, deserialize=deserialize)  # type: ignore
+
+    def delete_session(self, session_id: str) -> bool:
+        deleted_legacy = False
+        if session_id in self._legacy_ids:
+            # Or the stock copy would be read again
+            deleted_legacy = super().delete_session(session_id)
+            self._legacy_ids.discard(session_id)
+        with self._lock:
+            entry = self._index.pop(session_id, None)
+            if entry is None:
+                return deleted_legacy
+            self._count_live(entry, -1)
+            self._append_index([{"s": session_id, "deleted": True}])
+        return True
+
+    def delete_sessions(self, session_ids: List[str]) -> None:
+        for session_id in session_ids:
+            self.delete_session(session_id)
+
+    def upsert_sessions(
+        self, sessions: List[Session], deserialize: Optional[bool] = True, preserve_updated_at: bool = False
+    ) -> List[Union[Session, Dict[str, Any]]]:
+        return [result for result in (self.upsert_session(s, deserialize=deserialize) for s in sessions) if result]
+
+
+def benchmark(num_sessions: int = 20000, baseline_sessions: int = 1000) -> None:
+    """Upserts and reads per second for JsonDb vs ShardedJsonDb."""
+    import random
+    import tempfile
+
+    from agno.run.agent import RunOutput, RunStatus
+
+    def make_session(i: int) -> AgentSession:
+        run = RunOutput(run_id=f"run-{i}", agent_id="benchmark", session_id=f"session-{i}", content="x" * 1000)
+        run.status = RunStatus.completed
+        return AgentSession(session_id=f"session-{i}", agent_id="benchmark", user_id=f"user-{i % 100}", runs=[run])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, db, count in [
+            ("JsonDb", JsonDb(db_path=f"{tmp}/plain"), baseline_sessions),
+            ("ShardedJsonDb", ShardedJsonDb(db_path=f"{tmp}/sharded"), num_sessions),
+        ]:
+            start = time.perf_counter()
+            for i in range(count):
+                db.upsert_session(make_session(i))
+            write_rate = count / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for _ in range(200):
+                db.get_session(f"session-{random.randrange(count)}", SessionType.AGENT)
+            read_rate = 200 / (time.perf_counter() - start)
+            print(f"{name:14} {count:6} sessions: {write_rate:8.0f} upserts/s, {read_rate:8.0f} reads/s")
+
+
+if __name__ == "__main__":
+    benchmark()
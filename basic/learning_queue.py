@@ -0,0 +1,169 @@
+"""
+LearningMachine whose extraction runs on a work queue instead of inside the run.
+
+agno already extracts learnings (session context and plans, decision logs, profiles...) in a
+background thread, but the run waits for it before returning, so every response pays for the
+extra model calls and db writes. `QueuedLearningMachine` hands the work to a pool of workers and
+returns right away:
+    - work for the same session (or user) always goes to the same worker, so updates to a plan
+      are applied in order
+    - the queue is bounded: when it is full, runs wait for a slot (backpressure) or, with
+      `block_when_full=False`, the work is dropped and counted
+    - building the context of a session with queued work waits for it first, so the next run
+      sees the plan the previous one produced
+    - `flush()` waits until everything queued is processed; `close()` runs at exit and waits up
+      to `close_timeout` seconds for it
+
+Works with sync dbs; with an async db, `aprocess` falls back to processing inline.
+"""
+
+import asyncio
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agno.db.base import AsyncBaseDb
+from agno.learn import LearningMachine
+from agno.utils.log import logger
+
+
+@dataclass
+class QueuedLearningMachine(LearningMachine):
+    """LearningMachine that processes learnings on a bounded pool of background workers."""
+
+    workers: int = 2
+    max_pending: int = 64
+    block_when_full: bool = True
+    # How long building a context waits for the queued work of its session
+    consistency_timeout: float = 30.0
+    # How long closing (at exit) waits for the queued work
+    close_timeout: float = 30.0
+
+    _queues: List["queue.Queue[Optional[Dict[str, Any]]]"] = field(default_factory=list, init=False, repr=False)
+    _threads: List[threading.Thread] = field(default_factory=list, init=False, repr=False)
+    _pending: Counter = field(default_factory=Counter, init=False, repr=False)
+    _cond: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False)
+    stats: Dict[str, Any] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Updated under _cond, by runs and workers alike
+        self.stats = {"queued": 0, "processed": 0, "failed": 0, "dropped": 0, "max_queue_wait_seconds": 0.0}
+        atexit.register(self.close)
+
+    def __deepcopy__(self, memo):
+        # Agent copies share the queue and its workers
+        return self
+
+    def _start_workers(self) -> None:
+        with self._cond:
+            if self._queues:
+                return
+            per_worker = max(1, self.max_pending // self.workers)
+            for i in range(self.workers):
+                work: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=per_worker)
+                thread = threading.Thread(target=self._work, args=(work,), name=f"learning-{i}", daemon=True)
+                thread.start()
+                self._queues.append(work)
+                self._threads.append(thread)
+
+    @staticmethod
+    def _key(context: Dict[str, Any]) -> str:
+        return context.get("session_id") or context.get("user_id") or ""
+
+    def _enqueue(self, context: Dict[str, Any]) -> bool:
+        self._start_workers()
+        key = self._key(context)
+        work = self._queues[hash(key) % len(self._queues)]
+        with self._cond:
+            self._pending[key] += 1
+        context["queued_at"] = time.monotonic()
+        try:
+            if self.block_when_full:
+                work.put(context)
+            else:
+                work.put_nowait(context)
+        except queue.Full:
+            with self._cond:
+                self._done(key)
+                self.stats["dropped"] += 1
+            logger.warning(f"Learning queue is full, dropped the learnings of {key or 'an anonymous run'}")
+            return False
+        with self._cond:
+            self.stats["queued"] += 1
+        return True
+
+    def _done(self, key: str) -> None:
+        self._pending[key] -= 1
+        if self._pending[key] <= 0:
+            del self._pending[key]
+        self._cond.notify_all()
+
+    def _work(self, work: "queue.Queue[Optional[Dict[str, Any]]]") -> None:
+        while True:
+            context = work.get()
+            if context is None:
+                work.task_done()
+                return
+            key = self._key(context)
+            waited = time.monotonic() - context.pop("queued_at")
+            outcome = "processed"
+            try:
+                LearningMachine.process(self, **context)
+            except Exception as e:
+                # Stores log their own errors, but anything else must not kill the worker
+                outcome = "failed"
+                logger.error(f"Failed to process the learnings of {key or 'an anonymous run'}: {e}")
+            finally:
+                with self._cond:
+                    self.stats[outcome] += 1
+                    self.stats["max_queue_wait_seconds"] = max(self.stats["max_queue_wait_seconds"], waited)
+                    self._done(key)
+                work.task_done()
+
+    def process(self, messages: List[Any], **kwargs) -> None:
+        # The run keeps its message list, so queue a copy of it
+        self._enqueue({"messages": list(messages), **kwargs})
+
+    async def aprocess(self, messages: List[Any], **kwargs) -> None:
+        if isinstance(self.db, AsyncBaseDb):
+            await super().aprocess(messages, **kwargs)
+            return
+        # A full queue blocks a thread, not the event loop
+        await asyncio.to_thread(self._enqueue, {"messages": list(messages), **kwargs})
+
+    def _wait_for(self, session_id: Optional[str], user_id: Optional[str]) -> None:
+        key = session_id or user_id or ""
+        with self._cond:
+            if key in self._pending and not self._cond.wait_for(
+                lambda: key not in self._pending, timeout=self.consistency_timeout
+            ):
+                logger.warning(f"Building learning context of {key} before its queued learnings were processed")
+
+    def build_context(self, user_id: Optional[str] = None, session_id: Optional[str] = None, **kwargs) -> str:
+        self._wait_for(session_id, user_id)
+        return super().build_context(user_id=user_id, session_id=session_id, **kwargs)
+
+    async def abuild_context(self, user_id: Optional[str] = None, session_id: Optional[str] = None, **kwargs) -> str:
+        await asyncio.to_thread(self._wait_for, session_id, user_id)
+        return await super().abuild_context(user_id=user_id, session_id=session_id, **kwargs)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued learnings are processed. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout=timeout)
+
+    def close(self) -> None:
+        if not self.flush(timeout=self.close_timeout):
+            # The workers are daemon threads, so a stuck store cannot hang the exit
+            logger.warning(f"Closing with learnings still queued after {self.close_timeout} seconds, they are lost")
+            return
+        for work in self._queues:
+            work.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._queues.clear()
+        self._threads.clear()
@@ -0,0 +1,194 @@
+"""
+Long-lived MCP session pool shared by the MCP examples.
+
+Starting an MCP server (e.g. `npx ...`) costs seconds of cold start, so instead of calling
+`connect()` / `close()` around every agent run, sessions are kept open and reused across
+agents and concurrent runs. Sessions are keyed by server parameters (env by its hash),
+health-checked before reuse, can be warmed up at process start and are reaped after being idle
+for a while.
+
+Run this file directly for a cold-vs-warm latency benchmark against the local stub server.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from agno.tools.mcp import MCPTools, MultiMCPTools
+from agno.utils.log import logger
+
+
+class _PooledSession:
+    """A connected MCP toolkit, owned by a background task that connects and closes it."""
+
+    def __init__(self, tools: Union[MCPTools, MultiMCPTools]):
+        self.tools = tools
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.last_checked = time.monotonic()
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.error: Optional[BaseException] = None
+        # Replaced by a new connection, closed once its last lease is returned
+        self.retired = False
+
+    async def hold(self) -> None:
+        # MCP transports must be entered and exited in the same task, so one task owns the connection
+        try:
+            # connect() only logs why it failed, _connect() raises it
+            await self.tools._connect()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+        await self.stop.wait()
+        await self.tools.close()
+
+    def retire(self) -> None:
+        self.retired = True
+        if self.leases == 0:
+            self.stop.set()
+
+
+class MCPSessionPool:
+    def __init__(self, idle_timeout: float = 300.0, health_check_interval: float = 30.0):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._sessions: Dict[str, _PooledSession] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.stats = {"connects": 0, "reuses": 0, "reconnects": 0, "reaped": 0}
+
+    @staticmethod
+    def _key(server: Dict[str, Any]) -> str:
+        # Servers differing only by env (e.g. credentials) get sessions of their own, and the key
+        # carries a hash of env rather than the secrets in it
+        key = {k: v for k, v in server.items() if k != "env"}
+        if server.get("env"):
+            env = json.dumps(server["env"], sort_keys=True, default=str)
+            key["env"] = hashlib.sha256(env.encode()).hexdigest()[:16]
+        return json.dumps(key, sort_keys=True, default=str)
+
+    async def _connect(self, key: str, server: Dict[str, Any]) -> _PooledSession:
+        tools = MultiMCPTools(**server) if "commands" in server or "urls" in server else MCPTools(**server)
+        pooled = _PooledSession(tools)
+        pooled.task = asyncio.create_task(pooled.hold())
+        await pooled.ready.wait()
+        if pooled.error is not None or not tools.initialized:
+            pooled.stop.set()
+            raise ConnectionError(f"Failed to connect to MCP server {key}") from pooled.error
+        self._sessions[key] = pooled
+        self.stats["connects"] += 1
+        # Lazily connected sessions are reaped too, not only warmed up ones
+        self.start_reaper()
+        return pooled
+
+    async def _get(self, server: Dict[str, Any]) -> _PooledSession:
+        key = self._key(server)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            pooled = self._sessions.get(key)
+            if pooled is not None:
+                # Ping only when the session has not been checked recently
+                if time.monotonic() - pooled.last_checked < self.health_check_interval:
+                    self.stats["reuses"] += 1
+                    return pooled
+                if await pooled.tools.is_alive():
+                    pooled.last_checked = time.monotonic()
+                    self.stats["reuses"] += 1
+                    return pooled
+                logger.warning(f"MCP session {key} is not alive, reconnecting")
+                self._sessions.pop(key, None)
+                # Runs still holding it keep it until they are done
+                pooled.retire()
+                self.stats["reconnects"] += 1
+            return await self._connect(key, server)
+
+    @asynccontextmanager
+    async def session(self, **server: Any) -> AsyncIterator[Union[MCPTools, MultiMCPTools]]:
+        """
+        Lease a connected toolkit for the given server, e.g. `pool.session(command="npx ...")`.
+        Pass `commands=[...]` or `urls=[...]` for a MultiMCPTools.
+        """
+        pooled = await self._get(server)
+        pooled.leases += 1
+        try:
+            yield pooled.tools
+        finally:
+            pooled.leases -= 1
+            pooled.last_used = time.monotonic()
+            if pooled.retired and pooled.leases == 0:
+                pooled.stop.set()
+
+    async def warm_up(self, servers: List[Dict[str, Any]]) -> None:
+        """Connect to the given servers up front, so the first run does not pay the cold start."""
+        results = await asyncio.gather(*[self._get(server) for server in servers], return_exceptions=True)
+        for server, result in zip(servers, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to warm up MCP server {self._key(server)}: {result}")
+
+    def start_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, self.health_check_interval))
+            now = time.monotonic()
+            for key, pooled in list(self._sessions.items()):
+                # Never reap a session that is leased by a running agent
+                if pooled.leases == 0 and now - pooled.last_used > self.idle_timeout:
+                    logger.info(f"Closing idle MCP session {key}")
+                    self._sessions.pop(key, None)
+                    pooled.stop.set()
+                    self.stats["reaped"] += 1
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for pooled in sessions:
+            pooled.stop.set()
+        await asyncio.gather(*[pooled.task for pooled in sessions if pooled.task], return_exceptions=True)
+
+
+# One pool per process, shared by every agent
+mcp_pool = MCPSessionPool()
+
+
+async def benchmark(runs: int = 5) -> None:
+    """Compare connect-per-run with pooled sessions against the local stub MCP server."""
+    import sys
+    from pathlib import Path
+
+    stub_command = f"{sys.executable} {Path(__file__).parent / 'mcp_stub_server.py'}"
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        tools = MCPTools(command=stub_command)
+        await tools.connect()
+        await tools.functions["echo"].entrypoint(text="ping")  # type: ignore
+        await tools.close()
+    cold = (time.perf_counter() - start) / runs
+
+    pool = MCPSessionPool()
+    await pool.warm_up([{"command": stub_command}])
+    start = time.perf_counter()
+    for _ in range(runs):
+        async with pool.session(command=stub_command) as tools:
+            await tools.functions["echo"].entrypoint(text="ping")  # type: ignore
+    warm = (time.perf_counter() - start) / runs
+    await pool.close()
+
+    print(f"connect per run: {cold * 1000:.1f} ms/run")
+    print(f"pooled session:  {warm * 1000:.1f} ms/run")
+    print(pool.stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,65 @@
+"""
+Minimal local MCP server over stdio, used to try the MCP examples and benchmark the
+session pool without network access or npx.
+
+Run with: MCPTools(command="python basic/mcp_stub_server.py")
+The stagehand_* tools are a headless stand-in for the Browserbase server: they fetch pages
+over plain HTTP and "extract" slowly, like a real browser would.
+Or over HTTP: `python basic/mcp_stub_server.py streamable-http`, then
+MCPTools(transport="streamable-http", url="http://127.0.0.1:8000/mcp")
+"""
+
+import asyncio
+import re
+import sys
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("stub")
+
+# The page currently "open" in the stand-in browser
+page = {"url": None, "text": ""}
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Return the given text unchanged."""
+    return text
+
+
+@mcp.tool()
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+@mcp.tool()
+async def slow_echo(text: str, seconds: float = 0.2) -> str:
+    """Return the given text after a delay, to simulate a slow tool."""
+    await asyncio.sleep(seconds)
+    return text
+
+
+@mcp.tool()
+async def stagehand_navigate(url: str) -> str:
+    """Navigate to a URL."""
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        response = await client.get(url)
+    page["url"] = url
+    page["text"] = re.sub(r"<[^>]+>", " ", response.text)
+    return f"Navigated to {url}"
+
+
+@mcp.tool()
+async def stagehand_extract(instruction: str) -> str:
+    """Extract data from the current page."""
+    if page["url"] is None:
+        return "Error: navigate to a page first"
+    # Real extraction drives the browser and a model, which takes a while
+    await asyncio.sleep(1.0)
+    return " ".join(page["text"].split())[:2000]
+
+
+if __name__ == "__main__":
+    mcp.run(transport=sys.argv[1] if len(sys.argv) > 1 else "stdio")
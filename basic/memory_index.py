@@ -0,0 +1,495 @@
+"""
+Top-k memory retrieval for agents with many user memories.
+
+`MemoryManager.get_user_memories(user_id)` loads every memory of the user, and the agent pastes
+all of them into the system prompt; the memory model gets all of them again on every update.
+`IndexedMemoryManager` keeps a per-user hybrid index (embedding similarity + BM25 keywords, fused
+by reciprocal rank) and only hands out the `top_k` memories relevant to the current input:
+    - add `memory_manager.retrieval_hook` to the agent's `pre_hooks`, so the next memory lookup
+      of the run is a search for the user's message
+    - memory writes (the memory model's tools, add/replace/delete) update the index in place,
+      so a write costs one embedding, whatever the number of memories (with an async db, the
+      user's index is rebuilt on its next search instead)
+    - embeddings are cached on disk by content, so rebuilding an index after a restart is cheap
+
+`agent.get_user_memories(user_id)` outside a run still returns everything.
+Run this file directly to benchmark prompt size and update latency as memories grow.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.db.base import AsyncBaseDb, BaseDb
+from agno.db.schemas.memory import UserMemory
+from agno.knowledge.embedder.base import Embedder
+from agno.knowledge.embedder.openai import OpenAIEmbedder
+from agno.memory import MemoryManager
+from agno.models.message import Message
+from agno.run.agent import RunInput
+
+STOPWORDS = {"a", "an", "and", "are", "for", "i", "in", "is", "it", "me", "my", "of", "on", "the", "to", "what", "with"}
+
+# (user_id, query) for the next memory lookup of the current run
+_pending_query: ContextVar[Optional[Tuple[str, str]]] = ContextVar("pending_memory_query", default=None)
+
+
+def _tokens(text: str) -> List[str]:
+    return [token for token in re.findall(r"\w+", text.lower()) if token not in STOPWORDS]
+
+
+class EmbeddingCache:
+    """Embeddings keyed by model and text, in a small SQLite file."""
+
+    def __init__(self, db_file: str):
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\n{text}".encode()).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # Stay under SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.astype(np.float32).tobytes()) for key, vector in vectors.items()],
+            )
+
+
+class _UserIndex:
+    """Vectors and an inverted index over one user's memories."""
+
+    def __init__(self):
+        self.memories: Dict[str, UserMemory] = {}
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.vectors: Optional[np.ndarray] = None
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def upsert(self, memory: UserMemory, vector: np.ndarray) -> None:
+        memory_id = memory.memory_id  # type: ignore
+        if memory_id in self.rows:
+            self._unindex_terms(memory_id)
+            self.total_length -= self.lengths[memory_id]
+            self.vectors[self.rows[memory_id]] = vector  # type: ignore
+        else:
+            self.rows[memory_id] = len(self.ids)
+            self.ids.append(memory_id)
+            # Grow by doubling, so appends stay amortized O(1)
+            if self.vectors is None:
+                self.vectors = np.zeros((8, len(vector)), dtype=np.float32)
+            elif len(self.ids) > len(self.vectors):
+                grown = np.zeros((max(8, 2 * len(self.vectors)), self.vectors.shape[1]), dtype=np.float32)
+                grown[: len(self.vectors)] = self.vectors
+                self.vectors = grown
+            self.vectors[self.rows[memory_id]] = vector
+        self.memories[memory_id] = memory
+        terms = Counter(_tokens(memory.memory or ""))
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[memory_id] = count
+        self.lengths[memory_id] = sum(terms.values())
+        self.total_length += self.lengths[memory_id]
+
+    def remove(self, memory_id: str) -> None:
+        if memory_id not in self.rows:
+            return
+        self._unindex_terms(memory_id)
+        # Move the last row into the hole
+        row, last = self.rows.pop(memory_id), len(self.ids) - 1
+        last_id = self.ids.pop()
+        if row != last:
+            self.ids[row] = last_id
+            self.rows[last_id] = row
+            self.vectors[row] = self.vectors[last]  # type: ignore
+        del self.memories[memory_id]
+        self.total_length -= self.lengths.pop(memory_id)
+
+    def _unindex_terms(self, memory_id: str) -> None:
+        for term in _tokens(self.memories[memory_id].memory or ""):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(memory_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def search(self, query: str, query_vector: np.ndarray, limit: int) -> List[UserMemory]:
+        if not self.ids or self.vectors is None:
+            return []
+        candidates = min(len(self.ids), 4 * limit)
+
+        # Cosine similarity, vectors are normalized
+        similarity = self.vectors[: len(self.ids)] @ query_vector
+        top = np.argpartition(-similarity, candidates - 1)[:candidates]
+        by_vector = [self.ids[i] for i in top[np.argsort(-similarity[top])]]
+
+        # BM25 over the query terms only
+        k1, b = 1.2, 0.75
+        average_length = self.total_length / len(self.ids) or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(_tokens(query)):
+            postings = self.postings.get(term, {})
+            idf = math.log(1 + (len(self.ids) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for memory_id, count in postings.items():
+                norm = count + k1 * (1 - b + b * self.lengths[memory_id] / average_length)
+                scores[memory_id] = scores.get(memory_id, 0.0) + idf * count * (k1 + 1) / norm
+        by_keyword = sorted(scores, key=scores.__getitem__, reverse=True)[:candidates]
+
+        # Reciprocal rank fusion: no need to calibrate cosine against BM25 scores
+        fused: Dict[str, float] = {}
+        for ranking in (by_vector, by_keyword):
+            for rank, memory_id in enumerate(ranking):
+                fused[memory_id] = fused.get(memory_id, 0.0) + 1 / (60 + rank)
+        best = sorted(fused, key=fused.__getitem__, reverse=True)[:limit]
+        return [self.memories[memory_id] for memory_id in best]
+
+
+class MemoryIndex:
+    """Hybrid embedding + keyword index over user memories, one `_UserIndex` per user."""
+
+    def __init__(self, embedder: Optional[Embedder] = None, cache_file: str = "tmp/memory_embeddings.db"):
+        self.embedder = embedder or OpenAIEmbedder()
+        self.cache = EmbeddingCache(cache_file)
+        self._users: Dict[str, _UserIndex] = {}
+        self._lock = threading.RLock()
+
+    def _embed(self, texts: List[str]) -> List[np.ndarray]:
+        keys = [EmbeddingCache.key(self.embedder.id, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            embeddings = self._get_embeddings(list(missing.values()))
+            new = {}
+            for key, embedding in zip(missing, embeddings):
+                vector = np.asarray(embedding, dtype=np.float32)
+                new[key] = vector / (np.linalg.norm(vector) or 1.0)
+            self.cache.put_many(new)
+            cached.update(new)
+        return [cached[key] for key in keys]
+
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if len(texts) > 1:
+            try:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    return list(executor.map(self.embedder.get_embedding, texts))
+            except RuntimeError:
+                # Executors refuse new work at interpreter shutdown, when queued memories are still extracted
+                pass
+        return [self.embedder.get_embedding(text) for text in texts]
+
+    def has_user(self, user_id: str) -> bool:
+        return user_id in self._users
+
+    def build(self, user_id: str, memories: List[UserMemory]) -> None:
+        memories = [memory for memory in memories if memory.memory_id is not None]
+        vectors = self._embed([memory.memory or "" for memory in memories])
+        index = _UserIndex()
+        for memory, vector in zip(memories, vectors):
+            index.upsert(memory, vector)
+        with self._lock:
+            self._users[user_id] = index
+
+    def upsert(self, memory: UserMemory) -> None:
+        user_id = memory.user_id or "default"
+        # Unbuilt users are indexed in full on their first search
+        if memory.memory_id is None or user_id not in self._users:
+            return
+        (vector,) = self._embed([memory.memory or ""])
+        with self._lock:
+            self._users[user_id].upsert(memory, vector)
+
+    def remove(self, user_id: str, memory_id: str) -> None:
+        with self._lock:
+            if user_id in self._users:
+                self._users[user_id].remove(memory_id)
+
+    def clear(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def search(self, user_id: str, query: str, limit: int) -> List[UserMemory]:
+        (query_vector,) = self._embed([query])
+        with self._lock:
+            index = self._users.get(user_id)
+            return index.search(query, query_vector, limit) if index is not None else []
+
+
+class _IndexedDb:
+    """Db proxy handed to the memory model's tools, so their writes update the index."""
+
+    def __init__(self, db: BaseDb, index: MemoryIndex):
+        self._db = db
+        self._index = index
+
+    def upsert_user_memory(self, memory: UserMemory, *args, **kwargs):
+        result = self._db.upsert_user_memory(memory, *args, **kwargs)
+        self._index.upsert(memory)
+        return result
+
+    def delete_user_memory(self, memory_id: str, user_id: Optional[str] = None):
+        self._db.delete_user_memory(memory_id=memory_id, user_id=user_id)
+        self._index.remove(user_id or "default", memory_id)
+
+    def clear_memories(self) -> None:
+        self._db.clear_memories()
+        self._index.clear()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._db, name)
+
+
+class IndexedMemoryManager(MemoryManager):
+    """MemoryManager that retrieves the `top_k` relevant memories instead of all of them."""
+
+    def __init__(self, *args, top_k: int = 8, index: Optional[MemoryIndex] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.top_k = top_k
+        self.index = index or MemoryIndex()
+
+    def retrieval_hook(self, run_input: RunInput, user_id: Optional[str] = None) -> None:
+        """Agent pre-hook: the next memory lookup of this run searches for the user's message."""
+        _pending_query.set((user_id or "default", run_input.input_content_string()))
+
+    @staticmethod
+    def _has_pending_query() -> bool:
+        """Whether the next memory lookup is a retrieval for the current run."""
+        return _pending_query.get() is not None
+
+    def search(self, user_id: str, query: str, limit: Optional[int] = None) -> List[UserMemory]:
+        if not self.index.has_user(user_id):
+            # One full load per user and process, incremental updates from then on
+            self.index.build(user_id, super().get_user_memories(user_id=user_id) or [])
+        return self.index.search(user_id, query, limit or self.top_k)
+
+    async def asearch(self, user_id: str, query: str, limit: Optional[int] = None) -> List[UserMemory]:
+        if not self.index.has_user(user_id):
+            memories = await super().aget_user_memories(user_id=user_id) or []
+            await asyncio.to_thread(self.index.build, user_id, memories)
+        # Embedding the query may call the embedding model
+        return await asyncio.to_thread(self.index.search, user_id, query, limit or self.top_k)
+
+    def get_user_memories(self, user_id: Optional[str] = None) -> Optional[List[UserMemory]]:
+        user_id = user_id or "default"
+        pending = _pending_query.get()
+        if pending is None or pending[0] != user_id:
+            return super().get_user_memories(user_id=user_id)
+        # One shot, so lookups after the run (e.g. agent.get_user_memories) list everything again
+        _pending_query.set(None)
+        return self.search(user_id, pending[1])
+
+    async def aget_user_memories(self, user_id: Optional[str] = None) -> Optional[List[UserMemory]]:
+        user_id = user_id or "default"
+        pending = _pending_query.get()
+        if pending is None or pending[0] != user_id:
+            return await super().aget_user_memories(user_id=user_id)
+        _pending_query.set(None)
+        return await self.asearch(user_id, pending[1])
+
+    def _existing_memories(self, user_id: str, text: str) -> List[Dict[str, Any]]:
+        if not text.strip():
+            return []
+        return [{"memory_id": m.memory_id, "memory": m.memory} for m in self.search(user_id, text)]
+
+    async def _aexisting_memories(self, user_id: str, text: str) -> List[Dict[str, Any]]:
+        if not text.strip():
+            return []
+        return [{"memory_id": m.memory_id, "memory": m.memory} for m in await self.asearch(user_id, text)]
+
+    def update_memory_task(self, task: str, user_id: Optional[str] = None) -> str:
+        # The memory model only needs the memories the task is about, not all of them
+        user_id = user_id or "default"
+        return self.run_memory_task(
+            task=task,
+            existing_memories=self._existing_memories(user_id, task),
+            user_id=user_id,
+            db=self.db,  # type: ignore
+            delete_memories=self.delete_memories,
+            update_memories=self.update_memories,
+            add_memories=self.add_memories,
+            clear_memories=self.clear_memories,
+        )
+
+    async def aupdate_memory_task(self, task: str, user_id: Optional[str] = None) -> str:
+        user_id = user_id or "default"
+        return await self.arun_memory_task(
+            task=task,
+            existing_memories=await self._aexisting_memories(user_id, task),
+            user_id=user_id,
+            db=self.db,  # type: ignore
+            delete_memories=self.delete_memories,
+            update_memories=self.update_memories,
+            add_memories=self.add_memories,
+            clear_memories=self.clear_memories,
+        )
+
+    def create_user_memories(
+        self,
+        message: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        agent_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> str:
+        if message:
+            messages = [Message(role="user", content=message)]
+        if not messages:
+            raise ValueError("You must provide either a message or a list of messages")
+        user_id = user_id or "default"
+        text = " ".join(m.get_content_string() for m in messages if m.role == "user" and m.content)
+        return self.create_or_update_memories(
+            messages=messages,
+            existing_memories=self._existing_memories(user_id, text),
+            user_id=user_id,
+            agent_id=agent_id,
+            team_id=team_id,
+            db=self.db,  # type: ignore
+            update_memories=self.update_memories,
+            add_memories=self.add_memories,
+        )
+
+    async def acreate_user_memories(
+        self,
+        message: Optional[str] = None,
+        messages: Optional[List[Message]] = None,
+        agent_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> str:
+        if message:
+            messages = [Message(role="user", content=message)]
+        if not messages:
+            raise ValueError("You must provide either a message or a list of messages")
+        user_id = user_id or "default"
+        text = " ".join(m.get_content_string() for m in messages if m.role == "user" and m.content)
+        return await self.acreate_or_update_memories(
+            messages=messages,
+            existing_memories=await self._aexisting_memories(user_id, text),
+            user_id=user_id,
+            agent_id=agent_id,
+            team_id=team_id,
+            db=self.db,  # type: ignore
+            update_memories=self.update_memories,
+            add_memories=self.add_memories,
+        )
+
+    def _get_db_tools(self, user_id: str, db: BaseDb, *args, **kwargs):
+        return super()._get_db_tools(user_id, _IndexedDb(db, self.index), *args, **kwargs)  # type: ignore
+
+    async def _aget_db_tools(self, user_id: str, db: AsyncBaseDb, *args, **kwargs):
+        # Only called for async dbs, whose tools await the db: rebuild the user's index after a write
+        tools = await super()._aget_db_tools(user_id, db, *args, **kwargs)
+        return [self._reindexing(user_id, tool) for tool in tools]
+
+    def _reindexing(self, user_id: str, tool: Callable) -> Callable:
+        @wraps(tool)
+        async def write(*args, **kwargs) -> str:
+            try:
+                return await tool(*args, **kwargs)
+            finally:
+                # clear_memory wipes every user's memories
+                self.index.clear(None if tool.__name__ == "clear_memory" else user_id)
+
+        return write
+
+    def _upsert_db_memory(self, memory: UserMemory) -> str:
+        result = super()._upsert_db_memory(memory)
+        self.index.upsert(memory)
+        return result
+
+    def _delete_db_memory(self, memory_id: str, user_id: Optional[str] = None) -> str:
+        result = super()._delete_db_memory(memory_id, user_id=user_id)
+        self.index.remove(user_id or "default", memory_id)
+        return result
+
+    def clear_user_memories(self, user_id: Optional[str] = None) -> None:
+        super().clear_user_memories(user_id=user_id)
+        self.index.clear(user_id or "default")
+
+    def clear(self) -> None:
+        super().clear()
+        self.index.clear()
+
+
+def benchmark(sizes: tuple = (100, 1_000, 10_000), top_k: int = 8) -> None:
+    """Prompt size, update and search latency as one user's memories grow, with a local embedder."""
+    import random
+    import tempfile
+    import time
+    from dataclasses import dataclass
+
+    @dataclass
+    class HashingEmbedder(Embedder):
+        """Feature hashing of tokens, a stand-in for a real embedding model."""
+
+        id: str = "hashing"
+        dimensions: int = 256
+
+        def get_embedding(self, text: str) -> List[float]:
+            vector = [0.0] * self.dimensions
+            for token in _tokens(text):
+                vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+            return vector
+
+    words = ["stocks", "bonds", "semiconductor", "ai", "risk", "crypto", "dividends", "travel", "coffee", "tennis",
+             "kids", "mortgage", "retirement", "savings", "energy", "healthcare", "europe", "japan", "tax", "etf"]
+    random.seed(0)
+
+    def make_memory(i: int) -> UserMemory:
+        text = f"User note {i}: likes {' and '.join(random.sample(words, 3))}"
+        return UserMemory(memory_id=f"memory-{i}", memory=text, user_id="power-user")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            index = MemoryIndex(embedder=HashingEmbedder(), cache_file=f"{tmp}/embeddings.db")
+            memories = [make_memory(i) for i in range(size)]
+            index.build("power-user", memories)
+
+            start = time.perf_counter()
+            for i in range(100):
+                index.upsert(make_memory(size + i))
+            update = (time.perf_counter() - start) / 100
+
+            start = time.perf_counter()
+            for _ in range(100):
+                found = index.search("power-user", "What semiconductor stocks fit my risk tolerance?", top_k)
+            search = (time.perf_counter() - start) / 100
+
+            all_chars = sum(len(m.memory or "") + 3 for m in memories)
+            top_k_chars = sum(len(m.memory or "") + 3 for m in found)
+            print(
+                f"{size:6} memories: all in prompt {all_chars:8} chars, top-{top_k} {top_k_chars:4} chars, "
+                f"update {update * 1000:.2f} ms, search {search * 1000:.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    benchmark()
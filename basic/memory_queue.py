@@ -0,0 +1,174 @@
+"""
+Memory extraction off the critical path of a run.
+
+With `enable_agentic_memory` or `update_memory_on_run`, each turn that teaches the agent something
+costs a second model call (the memory model) before the user gets the final answer.
+`BackgroundMemoryManager` queues turns instead, through an agent post-hook, and a background
+worker extracts memories later:
+    - turns of the same user are debounced into a single memory model call, made once the user
+      has been quiet for `debounce_seconds` (and at most `max_delay_seconds` after the first turn)
+    - different users are extracted in parallel
+    - until their extraction lands, queued turns are shown to the agent as provisional memories,
+      so the next turn already sees what the user just said (read-your-writes)
+
+Call `flush()` to wait for pending extractions, e.g. before listing memories. Turns still queued
+at exit are extracted by `close()`, which runs then.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from agno.db.schemas.memory import UserMemory
+from agno.models.message import Message
+from agno.run.agent import RunOutput
+from agno.utils.log import logger
+
+from memory_index import IndexedMemoryManager
+
+
+class _PendingTurns:
+    def __init__(self, now: float):
+        self.messages: List[Message] = []
+        self.first_at = now
+        self.last_at = now
+
+
+class BackgroundMemoryManager(IndexedMemoryManager):
+    """IndexedMemoryManager whose memories are extracted by a debounced background worker."""
+
+    def __init__(
+        self,
+        *args,
+        debounce_seconds: float = 2.0,
+        max_delay_seconds: float = 10.0,
+        max_workers: int = 4,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.stats = {"queued_turns": 0, "extractions": 0, "failed_extractions": 0}
+
+        self._pending: Dict[str, _PendingTurns] = {}
+        # Turns whose extraction is running, still shown as provisional memories
+        self._in_flight: Dict[str, List[Message]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        # Threads of our own rather than an executor: executors refuse new work once the interpreter
+        # starts shutting down, which is when close() extracts the turns still queued
+        self._jobs: "queue.Queue[Optional[Tuple[str, List[Message]]]]" = queue.Queue()
+        self._extractors = [
+            threading.Thread(target=self._run_jobs, name=f"memory-{i}", daemon=True) for i in range(max_workers)
+        ]
+        for extractor in self._extractors:
+            extractor.start()
+        self._worker = threading.Thread(target=self._schedule, name="memory-scheduler", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def queue_turn(self, run_output: RunOutput, user_id: Optional[str] = None) -> None:
+        """Agent post-hook: queue the user's message for memory extraction, without waiting for it."""
+        if run_output.input is None:
+            return
+        content = run_output.input.input_content_string()
+        if not content.strip():
+            return
+        now = time.monotonic()
+        with self._cond:
+            pending = self._pending.setdefault(user_id or "default", _PendingTurns(now))
+            pending.messages.append(Message(role="user", content=content))
+            pending.last_at = now
+            self.stats["queued_turns"] += 1
+            self._cond.notify_all()
+
+    def _deadline(self, pending: _PendingTurns) -> float:
+        return min(pending.last_at + self.debounce_seconds, pending.first_at + self.max_delay_seconds)
+
+    def _schedule(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                due = [u for u, p in self._pending.items() if self._closed or self._deadline(p) <= now]
+                for user_id in due:
+                    # One extraction per user at a time, so writes to the same memories never race
+                    if user_id in self._in_flight:
+                        continue
+                    messages = self._pending.pop(user_id).messages
+                    self._jobs.put((user_id, messages))
+                    self._in_flight[user_id] = messages
+                if self._closed and not self._pending and not self._in_flight:
+                    return
+                waiting = [self._deadline(p) for u, p in self._pending.items() if u not in self._in_flight]
+                self._cond.wait(timeout=max(min(waiting) - now, 0.0) if waiting else None)
+
+    def _run_jobs(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._extract(*job)
+
+    def _extract(self, user_id: str, messages: List[Message]) -> None:
+        try:
+            # All the debounced turns of the user in one memory model call
+            self.create_user_memories(messages=messages, user_id=user_id)
+            self.stats["extractions"] += 1
+        except Exception as e:
+            self.stats["failed_extractions"] += 1
+            logger.error(f"Failed to extract memories for {user_id}: {e}")
+        finally:
+            with self._cond:
+                self._in_flight.pop(user_id, None)
+                self._cond.notify_all()
+
+    def get_user_memories(self, user_id: Optional[str] = None) -> Optional[List[UserMemory]]:
+        user_id = user_id or "default"
+        in_run = self._has_pending_query()
+        memories = super().get_user_memories(user_id=user_id) or []
+        return self._with_provisional(user_id, memories) if in_run else memories
+
+    async def aget_user_memories(self, user_id: Optional[str] = None) -> Optional[List[UserMemory]]:
+        user_id = user_id or "default"
+        in_run = self._has_pending_query()
+        memories = await super().aget_user_memories(user_id=user_id) or []
+        return self._with_provisional(user_id, memories) if in_run else memories
+
+    def _with_provisional(self, user_id: str, memories: List[UserMemory]) -> List[UserMemory]:
+        with self._cond:
+            provisional = self._in_flight.get(user_id, []) + (
+                self._pending[user_id].messages if user_id in self._pending else []
+            )
+        return memories + [
+            UserMemory(memory=f"(said recently, not saved yet) {message.content}", user_id=user_id)
+            for message in provisional
+        ]
+
+    def flush(self, user_id: Optional[str] = None) -> None:
+        """Extract the queued turns now (of one user, or of everyone) and wait until they are saved."""
+        with self._cond:
+            for pending_user, pending in self._pending.items():
+                if user_id is None or pending_user == user_id:
+                    pending.first_at = pending.last_at = float("-inf")
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._has_work(user_id))
+
+    def _has_work(self, user_id: Optional[str]) -> bool:
+        if user_id is None:
+            return bool(self._pending or self._in_flight)
+        return user_id in self._pending or user_id in self._in_flight
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        # The scheduler hands out every queued turn before it returns
+        self._worker.join()
+        for _ in self._extractors:
+            self._jobs.put(None)
+        for extractor in self._extractors:
+            extractor.join()
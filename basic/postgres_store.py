@@ -0,0 +1,455 @@
+"""
+Pooled, batched PostgresDb for AgentOS and other multi-worker deployments.
+
+`PostgresDb(db_url=...)` builds an engine with SQLAlchemy's default pool (5 connections + 10
+overflow, 30s timeout), lets psycopg prepare a statement only after 5 executions, and opens a
+transaction per session or memory upsert. `PooledPostgresDb` instead:
+    - sizes the pool explicitly and keeps hot connections in use (LIFO), so idle ones get recycled
+    - prepares statements on first use and keeps more of them per connection, on top of a larger
+      SQLAlchemy compiled statement cache
+    - with `batch_writes=True`, queues session upserts (runs and their events live in the session
+      row) and memory upserts, and commits them in bulk from a single writer thread
+    - records pool wait time and query latency in `db.metrics`
+
+`PooledSqliteDb` is the same class over a SQLite file in WAL mode, a local stand-in when no
+Postgres is running. Run this file directly to benchmark sessions-per-second by number of workers,
+against Postgres if `PG_DB_URL` is set, else against the SQLite stand-in.
+
+Batched writes are only read back by the process that queued them: leave them off when several
+processes (e.g. AgentOS workers) serve the same sessions, as a queued write is invisible to the
+others until it is committed.
+"""
+
+import threading
+import time
+from collections import deque
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+from uuid import uuid4
+
+from agno.db.base import SessionType
+from agno.db.postgres import PostgresDb
+from agno.db.schemas.memory import UserMemory
+from agno.db.sqlite import SqliteDb
+from agno.session import AgentSession, TeamSession, WorkflowSession
+from agno.utils.log import logger
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from sqlite_store import BatchWriter, set_wal_pragmas
+
+Session = Union[AgentSession, TeamSession, WorkflowSession]
+
+
+class DbMetrics:
+    """Pool wait time and query latency of an engine, over the last `window` samples."""
+
+    def __init__(self, window: int = 10_000):
+        self._pool_waits: Deque[float] = deque(maxlen=window)
+        self._queries: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.counters = {
+            "checkouts": 0,
+            "pool_timeouts": 0,
+            "queries": 0,
+            "batches": 0,
+            "batched_writes": 0,
+            "dropped_writes": 0,
+        }
+
+    def record_pool_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._pool_waits.append(seconds)
+            self.counters["checkouts"] += 1
+            self.counters["pool_timeouts"] += timed_out
+
+    def record_query(self, seconds: float) -> None:
+        with self._lock:
+            self._queries.append(seconds)
+            self.counters["queries"] += 1
+
+    def record_batch(self, size: int) -> None:
+        with self._lock:
+            self.counters["batches"] += 1
+            self.counters["batched_writes"] += size
+
+    def record_dropped_write(self) -> None:
+        with self._lock:
+            self.counters["dropped_writes"] += 1
+
+    @staticmethod
+    def _summary(samples: List[float]) -> Dict[str, float]:
+        if not samples:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        samples.sort()
+        return {
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+            "p95_ms": round(samples[int(len(samples) * 0.95)] * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+        }
+
+    def snapshot(self, engine: Optional[Engine] = None) -> Dict[str, Any]:
+        with self._lock:
+            pool_waits, queries, counters = list(self._pool_waits), list(self._queries), dict(self.counters)
+        snapshot: Dict[str, Any] = {
+            "pool_wait": self._summary(pool_waits),
+            "query_latency": self._summary(queries),
+            **counters,
+        }
+        if engine is not None and isinstance(engine.pool, QueuePool):
+            snapshot["pool"] = {
+                "size": engine.pool.size(),
+                "checked_out": engine.pool.checkedout(),
+                "overflow": max(engine.pool.overflow(), 0),
+            }
+        return snapshot
+
+    def attach(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_query(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def end_query(conn, cursor, statement, parameters, context, executemany):
+            self.record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+        @event.listens_for(engine, "handle_error")
+        def end_failed_query(context):
+            # after_cursor_execute does not run for a failed statement
+            if context.connection is not None and context.connection.info.get("query_start"):
+                context.connection.info["query_start"].pop()
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection."""
+
+    metrics: Optional[DbMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.record_pool_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_pool_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool, which must keep reporting
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def pooled_engine(
+    db_url: str,
+    metrics: DbMetrics,
+    pool_size: int = 10,
+    max_overflow: int = 10,
+    pool_timeout: float = 10.0,
+    prepared_statements: int = 256,
+) -> Engine:
+    """
+    Engine with an explicitly sized pool, statement caching and metrics.
+
+    Size the pool for the number of AgentOS workers times their concurrent runs, plus one
+    connection for the writer thread. Behind PgBouncer in transaction mode, pass
+    `prepared_statements=0`: server side prepared statements do not survive across transactions.
+    """
+    connect_args: Dict[str, Any] = {}
+    if db_url.startswith("postgresql+psycopg"):
+        # Prepare on first execution, agno runs the same few statements over and over
+        connect_args["prepare_threshold"] = 1 if prepared_statements else None
+    elif db_url.startswith("sqlite"):
+        Path(db_url.split("///", 1)[1]).resolve().parent.mkdir(parents=True, exist_ok=True)
+        connect_args.update(check_same_thread=False, timeout=30, cached_statements=prepared_statements or 128)
+
+    engine = create_engine(
+        db_url,
+        poolclass=_TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        # Compiled SQL cache, shared by all connections
+        query_cache_size=2000,
+        connect_args=connect_args,
+    )
+    engine.pool.metrics = metrics  # type: ignore
+
+    if db_url.startswith("postgresql+psycopg") and prepared_statements:
+
+        @event.listens_for(engine, "connect")
+        def set_prepared_max(dbapi_connection, _):
+            dbapi_connection.prepared_max = prepared_statements
+
+    elif db_url.startswith("sqlite"):
+        event.listen(engine, "connect", set_wal_pragmas)
+
+    metrics.attach(engine)
+    return engine
+
+
+class BatchedWrites(BatchWriter):
+    """
+    Mixin for an agno db whose session and memory upserts are committed in bulk by one writer thread.
+
+    Upserts return as soon as they are queued; reads of a queued session or memory are served from
+    the queue, and memory listings wait for queued memories, so a run always sees its own writes.
+    Call `flush()` to wait until everything queued is committed (it also runs at exit).
+    Until `_start_writer` runs, every write goes straight to the db.
+    """
+
+    metrics: DbMetrics
+
+    def __init__(self, *args, **kwargs):
+        # Latest queued version of each session and memory, for read-your-writes
+        self._pending_sessions: Dict[str, Session] = {}
+        self._pending_memories: Dict[str, UserMemory] = {}
+        self._pending_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _queues_writes(self) -> bool:
+        # The bulk upserts fall back to single ones on errors: write those, never re-queue them
+        return self._writer is not None and not self._in_writer()
+
+    def _commit_batch(self, batch: List[Union[Session, UserMemory]]) -> None:
+        # Only the latest version of each session and memory needs to be written
+        sessions = {item.session_id: item for item in batch if not isinstance(item, UserMemory)}
+        memories = {item.memory_id: item for item in batch if isinstance(item, UserMemory)}
+        if sessions:
+            self.upsert_sessions(list(sessions.values()), deserialize=False)  # type: ignore
+        if memories:
+            self.upsert_memories(list(memories.values()), deserialize=False)  # type: ignore
+
+    def _release(self, batch: List[Union[Session, UserMemory]]) -> None:
+        with self._pending_lock:
+            for item in batch:
+                pending = self._pending_memories if isinstance(item, UserMemory) else self._pending_sessions
+                key = item.memory_id if isinstance(item, UserMemory) else item.session_id
+                if pending.get(key) is item:  # type: ignore
+                    del pending[key]  # type: ignore
+
+    def _on_commit(self, batch: List[Union[Session, UserMemory]]) -> None:
+        self.metrics.record_batch(len(batch))
+
+    def _on_drop(self, item: Union[Session, UserMemory], error: Exception) -> None:
+        self.metrics.record_dropped_write()
+        what = f"memory {item.memory_id}" if isinstance(item, UserMemory) else f"session {item.session_id}"
+        logger.error(f"Dropped the write of {what}: {error}")
+
+    def upsert_session(
+        self, session: Session, deserialize: Optional[bool] = True
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        if not self._queues_writes():
+            return super().upsert_session(session, deserialize=deserialize)  # type: ignore
+        # The run keeps mutating its session, so queue a snapshot of it
+        session = deepcopy(session)
+        with self._pending_lock:
+            self._pending_sessions[session.session_id] = session
+        self._queue.put(session)
+        return session if deserialize else session.to_dict()
+
+    def get_session(
+        self,
+        session_id: str,
+        session_type: SessionType,
+        user_id: Optional[str] = None,
+        deserialize: Optional[bool] = True,
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        with self._pending_lock:
+            pending = self._pending_sessions.get(session_id)
+        if pending is not None and (user_id is None or pending.user_id == user_id):
+            # A copy, or the caller's changes would leak into the queued write
+            return deepcopy(pending) if deserialize else pending.to_dict()
+        return super().get_session(session_id, session_type, user_id=user_id, deserialize=deserialize)  # type: ignore
+
+    def upsert_user_memory(
+        self, memory: UserMemory, deserialize: Optional[bool] = True
+    ) -> Optional[Union[UserMemory, Dict[str, Any]]]:
+        if not self._queues_writes():
+            return super().upsert_user_memory(memory, deserialize=deserialize)  # type: ignore
+        memory = deepcopy(memory)
+        if memory.memory_id is None:
+            memory.memory_id = str(uuid4())
+        with self._pending_lock:
+            self._pending_memories[memory.memory_id] = memory
+        self._queue.put(memory)
+        return memory if deserialize else memory.to_dict()
+
+    def get_user_memory(
+        self, memory_id: str, deserialize: Optional[bool] = True, user_id: Optional[str] = None
+    ) -> Optional[Union[UserMemory, Dict[str, Any]]]:
+        with self._pending_lock:
+            pending = self._pending_memories.get(memory_id)
+        if pending is not None and (user_id is None or pending.user_id == user_id):
+            # A copy, or the caller's changes would leak into the queued write
+            return deepcopy(pending) if deserialize else pending.to_dict()
+        return super().get_user_memory(memory_id, deserialize=deserialize, user_id=user_id)  # type: ignore
+
+    def get_user_memories(self, *args, **kwargs):
+        # Listings are filtered and paginated in SQL, so queued memories must land first
+        if self._pending_memories:
+            self.flush()
+        return super().get_user_memories(*args, **kwargs)  # type: ignore
+
+    def delete_user_memory(self, *args, **kwargs):
+        self.flush()
+        return super().delete_user_memory(*args, **kwargs)  # type: ignore
+
+    def delete_user_memories(self, *args, **kwargs):
+        self.flush()
+        return super().delete_user_memories(*args, **kwargs)  # type: ignore
+
+    def delete_session(self, *args, **kwargs):
+        self.flush()
+        return super().delete_session(*args, **kwargs)  # type: ignore
+
+    def delete_sessions(self, *args, **kwargs):
+        self.flush()
+        return super().delete_sessions(*args, **kwargs)  # type: ignore
+
+
+class PooledPostgresDb(BatchedWrites, PostgresDb):
+    """PostgresDb with an explicitly sized pool, prepared statements, metrics and optional batched writes."""
+
+    def __init__(
+        self,
+        db_url: str,
+        pool_size: int = 10,
+        max_overflow: int = 10,
+        pool_timeout: float = 10.0,
+        prepared_statements: int = 256,
+        max_batch_size: int = 256,
+        batch_wait_seconds: float = 0.005,
+        batch_writes: bool = False,
+        **kwargs,
+    ):
+        self.metrics = DbMetrics()
+        engine = pooled_engine(
+            db_url,
+            self.metrics,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            prepared_statements=prepared_statements,
+        )
+        super().__init__(db_url=db_url, db_engine=engine, **kwargs)
+        if batch_writes:
+            self._start_writer(max_batch_size, batch_wait_seconds)
+
+
+class PooledSqliteDb(BatchedWrites, SqliteDb):
+    """The same pooling, batching and metrics over a SQLite file, as a stand-in for PooledPostgresDb."""
+
+    def __init__(
+        self,
+        db_file: str,
+        pool_size: int = 10,
+        max_overflow: int = 10,
+        pool_timeout: float = 10.0,
+        prepared_statements: int = 256,
+        max_batch_size: int = 256,
+        batch_wait_seconds: float = 0.005,
+        batch_writes: bool = False,
+        **kwargs,
+    ):
+        self.metrics = DbMetrics()
+        engine = pooled_engine(
+            f"sqlite:///{Path(db_file).resolve()}",
+            self.metrics,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            prepared_statements=prepared_statements,
+        )
+        super().__init__(db_file=db_file, db_engine=engine, **kwargs)
+        if batch_writes:
+            self._start_writer(max_batch_size, batch_wait_seconds)
+
+
+def benchmark(num_sessions: int = 1000, workers: tuple = (1, 2, 4, 8), round_trip_ms: float = 0.5) -> None:
+    """
+    Sessions-per-second by number of workers, plain db vs pooled and batched db.
+
+    The SQLite stand-in adds `round_trip_ms` to every statement, like a network hop to Postgres.
+    """
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    from agno.run.agent import RunOutput, RunStatus
+
+    def make_session(i: int) -> AgentSession:
+        return AgentSession(
+            session_id=f"session-{uuid4()}",
+            agent_id="benchmark",
+            user_id="user",
+            runs=[RunOutput(run_id=f"run-{i}", agent_id="benchmark", content="x" * 2000, status=RunStatus.completed)],
+            session_data={"session_state": {"i": i}},
+            created_at=int(time.time()),
+        )
+
+    def run_session(db: Union[SqliteDb, PostgresDb], session: AgentSession) -> bool:
+        # Roughly what a run does: load the session, save it, add a memory
+        try:
+            db.get_session(session.session_id, SessionType.AGENT)
+            db.upsert_session(session)
+            db.upsert_user_memory(UserMemory(memory=f"memory {session.session_id}", user_id="user"))
+            return True
+        except Exception:
+            return False
+
+    pg_url = os.getenv("PG_DB_URL")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_workers in workers:
+            if pg_url:
+                dbs = [
+                    PostgresDb(db_url=pg_url),
+                    PooledPostgresDb(db_url=pg_url, pool_size=num_workers + 1, batch_writes=True),
+                ]
+            else:
+                dbs = [
+                    SqliteDb(db_file=f"{tmp}/plain_{num_workers}.db"),
+                    PooledSqliteDb(
+                        db_file=f"{tmp}/pooled_{num_workers}.db", pool_size=num_workers + 1, batch_writes=True
+                    ),
+                ]
+                for db in dbs:
+                    event.listen(db.db_engine, "before_cursor_execute", lambda *_: time.sleep(round_trip_ms / 1000))
+
+            for db in dbs:
+                # Create the tables outside the timing
+                run_session(db, make_session(-1))
+                if isinstance(db, BatchedWrites):
+                    db.flush()
+
+                sessions = [make_session(i) for i in range(num_sessions)]
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    failures = sum(not ok for ok in executor.map(lambda s: run_session(db, s), sessions))
+                line = f"{type(db).__name__:16} {num_workers:2} workers: "
+                if isinstance(db, BatchedWrites):
+                    db.flush()
+                    snapshot = db.metrics.snapshot()
+                    line += (
+                        f"{num_sessions / (time.perf_counter() - start):6.0f} sessions/s, "
+                        f"pool wait p95 {snapshot['pool_wait']['p95_ms']} ms, "
+                        f"query p95 {snapshot['query_latency']['p95_ms']} ms, "
+                        f"{snapshot['batched_writes'] / max(snapshot['batches'], 1):.0f} writes/batch"
+                    )
+                else:
+                    line += f"{num_sessions / (time.perf_counter() - start):6.0f} sessions/s, {failures} failed"
+                print(line)
+                db.close()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,35 @@
+"""
+Post-hook reporting how much of the system prompt providers can cache across runs.
+
+Providers cache the longest prompt prefix that is identical between requests, so the dynamic
+sections of the system prompt (session state, learned context...) belong at its end.
+"""
+
+from typing import Callable
+
+from agno.run.agent import RunOutput
+from agno.utils.log import log_info
+
+
+def prompt_prefix_hook(dynamic_marker: str) -> Callable[[RunOutput], None]:
+    """
+    Create a post-hook that logs the size of the stable system prompt prefix and the cached tokens.
+
+    Args:
+        dynamic_marker: Start of the first dynamic section of the system prompt, e.g. "<session_state>"
+
+    Returns:
+        The post-hook
+    """
+
+    def report_prompt_prefix(run_output: RunOutput) -> None:
+        system_message = next((m for m in run_output.messages or [] if m.role == "system"), None)
+        if system_message is None or not isinstance(system_message.content, str):
+            return
+
+        # Everything before the first dynamic section is a cacheable prefix
+        stable_prefix = system_message.content.split(dynamic_marker)[0]
+        cached_tokens = run_output.metrics.cache_read_tokens if run_output.metrics else 0
+        log_info(f"Stable prompt prefix: {len(stable_prefix.encode())} bytes, cached tokens: {cached_tokens}")
+
+    return report_prompt_prefix
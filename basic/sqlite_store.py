@@ -0,0 +1,553 @@
+"""
+High-concurrency SQLite storage shared by the agent and workflow examples.
+
+`SqliteDb(db_file=...)` opens the file in rollback-journal mode and commits (and fsyncs) every
+session upsert on the calling thread, so concurrent runs hit `database is locked`. This module
+offers a drop-in `BatchedSqliteDb`:
+    - WAL journaling, so readers never block the writer and see a consistent snapshot
+    - a pooled engine for readers, with a larger prepared statement cache per connection
+    - a single writer thread that drains a queue of session upserts and commits them in batches
+
+`DeltaSqliteDb` additionally writes each upsert as a delta (new runs and a session_state patch)
+instead of the whole session, so long sessions keep a constant write cost per run.
+
+Run this file directly to benchmark sessions-per-second against the plain SqliteDb, and the
+write cost per run of a growing session.
+"""
+
+import atexit
+import json
+import queue
+import threading
+import time
+from copy import deepcopy
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from agno.db.base import SessionType
+from agno.db.sqlite import SqliteDb
+from agno.db.utils import CustomJSONEncoder, serialize_session_json_fields
+from agno.session import AgentSession, TeamSession, WorkflowSession
+from agno.utils.log import logger
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Engine
+
+Session = Union[AgentSession, TeamSession, WorkflowSession]
+SESSION_TYPES = {AgentSession: SessionType.AGENT, TeamSession: SessionType.TEAM, WorkflowSession: SessionType.WORKFLOW}
+
+
+def wal_engine(db_file: str, pool_size: int = 8) -> Engine:
+    """SQLAlchemy engine for a SQLite file in WAL mode, with a pool of reader connections."""
+    db_path = Path(db_file).resolve()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        pool_size=pool_size,
+        max_overflow=0,
+        # Connections move between the pool's threads; sqlite3 keeps this many prepared statements each
+        connect_args={"check_same_thread": False, "timeout": 30, "cached_statements": 512},
+    )
+
+    event.listen(engine, "connect", set_wal_pragmas)
+    return engine
+
+
+def set_wal_pragmas(dbapi_connection, _) -> None:
+    """`connect` event listener putting a new SQLite connection in WAL mode."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode NORMAL only fsyncs at checkpoints, and stays consistent after a crash
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
+
+class BatchWriter:
+    """
+    Mixin for an agno db whose writes are queued and committed in batches by a single writer thread.
+
+    Subclasses put items on `_queue`, commit them in `_commit_batch` and forget their
+    read-your-writes copies in `_release`. A failed batch is retried one item at a time, and the
+    items that still fail are dropped through `_on_drop`, so one bad write never blocks the queue.
+    Writes made on the writer thread (see `_in_writer`) must go to the db, never back to the queue.
+    """
+
+    # Until `_start_writer` runs, flush and close have nothing to wait for
+    _writer: Optional[threading.Thread] = None
+
+    def _start_writer(self, max_batch_size: int, batch_wait_seconds: float, name: str = "db-writer") -> None:
+        self.max_batch_size = max_batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_batches, name=name, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _in_writer(self) -> bool:
+        return threading.current_thread() is self._writer
+
+    def _write_batches(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch: List[Any] = [item]
+            # Collect whatever else arrives within the batch window
+            try:
+                while len(batch) < self.max_batch_size:
+                    next_item = self._queue.get(timeout=self.batch_wait_seconds)
+                    if next_item is None:
+                        self._queue.put(None)
+                        self._queue.task_done()
+                        break
+                    batch.append(next_item)
+            except queue.Empty:
+                pass
+
+            try:
+                self._commit_batch(batch)
+                self._on_commit(batch)
+            except Exception as e:
+                # Commit one at a time, so a bad write only drops itself
+                logger.warning(f"Failed to commit {len(batch)} writes, retrying them one by one: {e}")
+                for item in batch:
+                    try:
+                        self._commit_batch([item])
+                    except Exception as e:
+                        self._on_drop(item, e)
+            finally:
+                self._release(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _commit_batch(self, batch: List[Any]) -> None:
+        raise NotImplementedError
+
+    def _release(self, batch: List[Any]) -> None:
+        pass
+
+    def _on_commit(self, batch: List[Any]) -> None:
+        pass
+
+    def _on_drop(self, item: Any, error: Exception) -> None:
+        logger.error(f"Dropped a queued write: {error}")
+
+    def flush(self) -> None:
+        """Block until every queued write is committed."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        super().close()  # type: ignore
+
+
+class BatchedSqliteDb(BatchWriter, SqliteDb):
+    """
+    SqliteDb whose session upserts are committed in batches by a single writer thread.
+
+    `upsert_session` returns as soon as the session is queued; reads of a queued session are
+    served from the queue, so a run always sees its own writes. Call `flush()` to wait until
+    everything queued is committed (it also runs at exit).
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        pool_size: int = 8,
+        max_batch_size: int = 256,
+        batch_wait_seconds: float = 0.005,
+        **kwargs,
+    ):
+        super().__init__(db_engine=wal_engine(db_file, pool_size=pool_size), db_file=db_file, **kwargs)
+        self.stats = {"queued": 0, "commits": 0, "committed_sessions": 0, "dropped": 0}
+        # Latest queued version of each session, for read-your-writes
+        self._pending: Dict[str, Session] = {}
+        self._pending_lock = threading.Lock()
+        self._start_writer(max_batch_size, batch_wait_seconds, name="sqlite-writer")
+
+    def _commit_batch(self, batch: List[Any]) -> None:
+        # Only the latest version of each session needs to be written
+        latest = {s.session_id: s for s in batch}
+        super().upsert_sessions(list(latest.values()), deserialize=False)
+        self.stats["committed_sessions"] += len(latest)
+
+    def _release(self, batch: List[Any]) -> None:
+        with self._pending_lock:
+            for item in batch:
+                if self._pending.get(item.session_id) is item:
+                    del self._pending[item.session_id]
+
+    def _on_commit(self, batch: List[Any]) -> None:
+        self.stats["commits"] += 1
+
+    def _on_drop(self, item: Any, error: Exception) -> None:
+        self.stats["dropped"] += 1
+        logger.error(f"Dropped the write of session {item.session_id}: {error}")
+
+    def upsert_session(
+        self, session: Session, deserialize: Optional[bool] = True
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        if self._in_writer():
+            # SqliteDb.upsert_sessions falls back to upsert_session on errors: write it, never re-queue it
+            return super().upsert_session(session, deserialize=deserialize)
+        # The run keeps mutating its session, so queue a snapshot of it
+        session = deepcopy(session)
+        with self._pending_lock:
+            self._pending[session.session_id] = session
+        self._queue.put(session)
+        self.stats["queued"] += 1
+        return session if deserialize else session.to_dict()
+
+    def get_session(
+        self,
+        session_id: str,
+        session_type: SessionType,
+        user_id: Optional[str] = None,
+        deserialize: Optional[bool] = True,
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        with self._pending_lock:
+            pending = self._pending.get(session_id)
+        if pending is not None and (user_id is None or pending.user_id == user_id):
+            # A copy, or the caller's changes would leak into the queued write
+            return deepcopy(pending) if deserialize else pending.to_dict()
+        return super().get_session(session_id, session_type, user_id=user_id, deserialize=deserialize)
+
+    def delete_session(self, *args, **kwargs) -> bool:
+        # A queued upsert would otherwise bring the session back
+        self.flush()
+        return super().delete_session(*args, **kwargs)
+
+    def delete_sessions(self, *args, **kwargs) -> None:
+        self.flush()
+        return super().delete_sessions(*args, **kwargs)
+
+
+def _merge_patch(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON merge patch (RFC 7396) turning `old` into `new`; removed keys map to None."""
+    patch: Dict[str, Any] = {key: None for key in old.keys() - new.keys()}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            both_dicts = isinstance(old[key], dict) and isinstance(value, dict)
+            patch[key] = _merge_patch(old[key], value) if both_dicts else value
+    return patch
+
+
+def _apply_patch(target: Dict[str, Any], patch: Dict[str, Any]) -> None:
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _apply_patch(target[key], value)
+        else:
+            target[key] = value
+
+
+class _SessionDelta:
+    """What one upsert changed: the session header, new or still open runs and a state patch."""
+
+    def __init__(self, header: Session, runs: List[Tuple[str, int, str]], state_patch: Optional[str], compact: bool):
+        self.session_id = header.session_id
+        self.header = header
+        self.runs = runs
+        self.state_patch = state_patch
+        self.compact = compact
+
+
+class DeltaSqliteDb(BatchedSqliteDb):
+    """
+    BatchedSqliteDb that persists each session upsert as a delta instead of the whole session.
+
+    Sessions live in their own `<session_table>_delta` table, which only keeps a small header: ids,
+    summary, metadata and session_data with the session_state as of the last compaction; its `runs`
+    column stays empty. Runs are written to `<session_table>_delta_runs` when they are new, and
+    again only while they are still open. session_state changes are appended to
+    `<session_table>_delta_state` as JSON merge patches and folded into the header every
+    `compact_every` patches. Write cost per run stays constant as the session grows.
+
+    `session_table` itself keeps the stock format, so other SqliteDb readers of the same file are
+    unaffected. A session found only there (written by a plain SqliteDb) is read whole, and its next
+    upsert moves it to the delta tables with all its runs.
+
+    Merge patch semantics apply, so a session_state key set to None is removed.
+    `get_sessions` returns headers without runs, of the sessions already moved to the delta tables.
+    """
+
+    OPEN_RUN_STATUSES = {"PENDING", "RUNNING", "PAUSED"}
+
+    def __init__(self, db_file: str, compact_every: int = 50, session_table: Optional[str] = None, **kwargs):
+        legacy_table = session_table or "agno_sessions"
+        super().__init__(db_file=db_file, session_table=f"{legacy_table}_delta", **kwargs)
+        # Sessions stored whole by a plain SqliteDb, read until their next upsert moves them here
+        self._legacy = SqliteDb(db_engine=self.db_engine, session_table=legacy_table)
+        self.compact_every = compact_every
+        self.runs_table = f"{self.session_table_name}_runs"
+        self.state_table = f"{self.session_table_name}_state"
+        # What this process last wrote per session, to compute the next delta
+        self._closed_runs: Dict[str, Set[str]] = {}
+        self._written_state: Dict[str, Dict[str, Any]] = {}
+        self._base_state: Dict[str, Dict[str, Any]] = {}
+        self._patch_counts: Dict[str, int] = {}
+        # Deltas must reach the queue in the order they were computed
+        self._tracking_lock = threading.Lock()
+
+        with self.db_engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {self.runs_table} (session_id TEXT NOT NULL, run_id TEXT NOT NULL, "
+                    "position INTEGER NOT NULL, run TEXT NOT NULL, PRIMARY KEY (session_id, run_id))"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {self.state_table} "
+                    "(seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, patch TEXT NOT NULL)"
+                )
+            )
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{self.state_table} ON {self.state_table} (session_id)"))
+
+    def upsert_session(
+        self, session: Session, deserialize: Optional[bool] = True
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        session_id = session.session_id
+        session_data = session.session_data or {}
+        state = session_data.get("session_state") or {}
+
+        with self._tracking_lock:
+            # Closed runs were written already and do not change any more
+            closed_runs = self._closed_runs.setdefault(session_id, set())
+            runs = []
+            for position, run in enumerate(session.runs or []):
+                if run.run_id in closed_runs:
+                    continue
+                runs.append((run.run_id, position, json.dumps(run.to_dict(), cls=CustomJSONEncoder)))
+                if getattr(run.status, "value", run.status) not in self.OPEN_RUN_STATUSES:
+                    closed_runs.add(run.run_id)
+
+            # The first write of a session in this process stores the full state, as does every compaction
+            state_patch = None
+            compact = session_id not in self._written_state or self._patch_counts[session_id] >= self.compact_every
+            if compact:
+                self._base_state[session_id] = deepcopy(state)
+                self._patch_counts[session_id] = 0
+            else:
+                patch = _merge_patch(self._written_state[session_id], state)
+                if patch:
+                    state_patch = json.dumps(patch, cls=CustomJSONEncoder)
+                    self._patch_counts[session_id] += 1
+            self._written_state[session_id] = deepcopy(state)
+
+            header_data = {**session_data, "session_state": self._base_state[session_id]}
+            # A copy, as the run keeps mutating the metadata and summary it shares with the session
+            header = deepcopy(replace(session, runs=None, session_data=header_data))  # type: ignore
+            delta = _SessionDelta(header, runs, state_patch, compact)
+            with self._pending_lock:
+                self._pending[session_id] = delta
+            self._queue.put(delta)
+            self.stats["queued"] += 1
+        return session if deserialize else session.to_dict()
+
+    def _commit_batch(self, batch: List[Any]) -> None:
+        table = self._get_table(table_type="sessions", create_table_if_not_found=True)
+
+        # Coalesce the batch: the latest header per session, and no patch older than a compaction
+        headers: Dict[str, Dict[str, Any]] = {}
+        compacted: Set[str] = set()
+        patches: List[Dict[str, Any]] = []
+        runs: List[Dict[str, Any]] = []
+        for delta in batch:
+            header = serialize_session_json_fields(delta.header.to_dict())
+            values = {column.name: header.get(column.name) for column in table.columns}  # type: ignore
+            values["session_type"] = SESSION_TYPES[type(delta.header)].value
+            values["created_at"] = values["created_at"] or int(time.time())
+            values["updated_at"] = int(time.time())
+            headers[delta.session_id] = values
+            if delta.compact:
+                compacted.add(delta.session_id)
+                patches = [patch for patch in patches if patch["session_id"] != delta.session_id]
+            if delta.state_patch is not None:
+                patches.append({"session_id": delta.session_id, "patch": delta.state_patch})
+            runs.extend(
+                {"session_id": delta.session_id, "run_id": run_id, "position": position, "run": run}
+                for run_id, position, run in delta.runs
+            )
+
+        stmt = sqlite.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["session_id"],
+            set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in ("session_id", "created_at")},  # type: ignore
+        )
+        # One transaction, so a header and the patches on top of it are always consistent
+        with self.db_engine.begin() as conn:
+            conn.execute(stmt, list(headers.values()))
+            if compacted:
+                conn.execute(
+                    text(f"DELETE FROM {self.state_table} WHERE session_id = :session_id"),
+                    [{"session_id": session_id} for session_id in compacted],
+                )
+            if patches:
+                conn.execute(
+                    text(f"INSERT INTO {self.state_table} (session_id, patch) VALUES (:session_id, :patch)"), patches
+                )
+            if runs:
+                conn.execute(
+                    text(
+                        f"INSERT OR REPLACE INTO {self.runs_table} (session_id, run_id, position, run) "
+                        "VALUES (:session_id, :run_id, :position, :run)"
+                    ),
+                    runs,
+                )
+        self.stats["committed_sessions"] += len(batch)
+
+    def _on_drop(self, item: Any, error: Exception) -> None:
+        super()._on_drop(item, error)
+        # Its runs and state patch are lost, so the next upsert of the session writes it whole again
+        self._forget(item.session_id)
+
+    def _forget(self, session_id: str) -> None:
+        with self._tracking_lock:
+            for written in (self._closed_runs, self._written_state, self._base_state, self._patch_counts):
+                written.pop(session_id, None)
+
+    def get_session(
+        self,
+        session_id: str,
+        session_type: SessionType,
+        user_id: Optional[str] = None,
+        deserialize: Optional[bool] = True,
+    ) -> Optional[Union[Session, Dict[str, Any]]]:
+        with self._pending_lock:
+            pending = session_id in self._pending
+        if pending:
+            # Deltas only make sense on top of what is stored, so let the writer catch up
+            self.flush()
+
+        session_raw = SqliteDb.get_session(self, session_id, session_type, user_id=user_id, deserialize=False)
+        if session_raw is None:
+            # Its first upsert in this process writes every run it has, which moves it to the delta tables
+            return self._legacy.get_session(session_id, session_type, user_id=user_id, deserialize=deserialize)
+
+        with self.db_engine.connect() as conn:
+            runs = conn.execute(
+                text(f"SELECT run FROM {self.runs_table} WHERE session_id = :session_id ORDER BY position"),
+                {"session_id": session_id},
+            ).fetchall()
+            patches = conn.execute(
+                text(f"SELECT patch FROM {self.state_table} WHERE session_id = :session_id ORDER BY seq"),
+                {"session_id": session_id},
+            ).fetchall()
+
+        session_data = session_raw.get("session_data") or {}
+        state = session_data.get("session_state") or {}
+        for (patch,) in patches:
+            _apply_patch(state, json.loads(patch))
+        session_raw["session_data"] = {**session_data, "session_state": state}
+        session_raw["runs"] = [json.loads(run) for (run,) in runs] or None
+        if not deserialize:
+            return session_raw
+        session_class = {SessionType.AGENT: AgentSession, SessionType.TEAM: TeamSession}.get(session_type, WorkflowSession)
+        return session_class.from_dict(session_raw)
+
+    def upsert_sessions(
+        self, sessions: List[Session], deserialize: Optional[bool] = True, preserve_updated_at: bool = False
+    ) -> List[Union[Session, Dict[str, Any]]]:
+        # Bulk writes go through the same deltas, the writer batches them anyway
+        return [self.upsert_session(session, deserialize=deserialize) for session in sessions]  # type: ignore
+
+    def delete_session(self, session_id: str) -> bool:
+        self.flush()
+        with self.db_engine.begin() as conn:
+            for table in (self.runs_table, self.state_table):
+                conn.execute(text(f"DELETE FROM {table} WHERE session_id = :session_id"), {"session_id": session_id})
+        self._forget(session_id)
+        # Or the stock copy would be read again
+        deleted_legacy = self._legacy.delete_session(session_id)
+        return super().delete_session(session_id) or deleted_legacy
+
+    def delete_sessions(self, session_ids: List[str]) -> None:
+        for session_id in session_ids:
+            self.delete_session(session_id)
+
+
+def benchmark(num_sessions: int = 500, num_threads: int = 8) -> None:
+    """Sessions-per-second of concurrent upserts, plain SqliteDb vs BatchedSqliteDb."""
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    from agno.run.agent import RunOutput
+
+    def make_session(i: int) -> AgentSession:
+        return AgentSession(
+            session_id=f"session-{i}",
+            agent_id="benchmark",
+            user_id="user",
+            runs=[RunOutput(run_id=f"run-{i}", session_id=f"session-{i}", content="x" * 2000)],
+            session_data={"session_state": {"i": i}},
+            created_at=int(time.time()),
+        )
+
+    sessions = [make_session(i) for i in range(num_sessions)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, db in [
+            ("SqliteDb", SqliteDb(db_file=f"{tmp}/plain.db")),
+            ("BatchedSqliteDb", BatchedSqliteDb(db_file=f"{tmp}/batched.db")),
+            ("DeltaSqliteDb", DeltaSqliteDb(db_file=f"{tmp}/delta.db")),
+        ]:
+            # Create the table outside the timing
+            db.upsert_session(make_session(-1))
+            failures = 0
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                for result in executor.map(lambda s: _try_upsert(db, s), sessions):
+                    failures += not result
+            if isinstance(db, BatchedSqliteDb):
+                db.flush()
+            elapsed = time.perf_counter() - start
+            print(f"{name:16} {num_sessions / elapsed:8.0f} sessions/s, {failures} failed")
+            db.close()
+
+
+def benchmark_long_session(num_runs: int = 300) -> None:
+    """Write cost per run as one session grows, whole-session upserts vs deltas."""
+    import tempfile
+
+    from agno.run.agent import RunOutput, RunStatus
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, db in [
+            ("BatchedSqliteDb", BatchedSqliteDb(db_file=f"{tmp}/batched.db")),
+            ("DeltaSqliteDb", DeltaSqliteDb(db_file=f"{tmp}/delta.db")),
+        ]:
+            session = AgentSession(session_id="long", agent_id="benchmark", created_at=int(time.time()), runs=[])
+            timings = []
+            for i in range(num_runs):
+                run = RunOutput(run_id=f"run-{i}", session_id="long", content="x" * 2000, status=RunStatus.completed)
+                session.runs.append(run)  # type: ignore
+                session.session_data = {"session_state": {"items": list(range(i % 10)), "last_run": i}}
+                start = time.perf_counter()
+                db.upsert_session(session)
+                db.flush()
+                timings.append(time.perf_counter() - start)
+            first, last = sum(timings[:20]) / 20, sum(timings[-20:]) / 20
+            print(f"{name:16} run 1-20: {first * 1000:.2f} ms/run, run {num_runs - 19}-{num_runs}: {last * 1000:.2f} ms/run")
+            db.close()
+
+
+def _try_upsert(db: SqliteDb, session: Session) -> bool:
+    try:
+        db.upsert_session(session)
+        return True
+    except Exception:
+        return False
+
+
+if __name__ == "__main__":
+    benchmark()
+    benchmark_long_session()
@@ -0,0 +1,136 @@
+"""
+Two-tier tool result cache shared by the tool hook examples.
+
+`TieredToolCache` is a tool hook keeping a bounded in-memory LRU (by entries and bytes) in front
+of a JSON file cache, so repeated tool calls are served from memory first, then from disk, and
+concurrent identical calls run the tool only once.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agno.utils.log import logger
+
+
+class TieredToolCache:
+    """
+    Tool hook that caches tool results in two tiers: a bounded in-memory LRU in front of
+    a JSON file cache.
+
+    Concurrent identical calls are deduplicated (single-flight): the first call runs the
+    tool and the others wait for its result. Only use it with sync tools.
+
+    Args:
+        cache_dir: Directory of the file cache
+        cache_ttl: Seconds a cached result stays valid, in both tiers
+        max_entries: Max number of results kept in memory
+        max_bytes: Max total size of the results kept in memory
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "/tmp/agno_cache/tiered",
+        cache_ttl: int = 3600,
+        max_entries: int = 256,
+        max_bytes: int = 8 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # key -> (expires_at, result, size in bytes), least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "shared_calls": 0, "misses": 0, "evictions": 0}
+
+    def __call__(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        key = hashlib.md5(f"{function_name}:{json.dumps(arguments, sort_keys=True, default=str)}".encode()).hexdigest()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                future: Future = Future()
+                self._in_flight[key] = future
+
+        # An identical call is already running, share its result
+        if in_flight is not None:
+            with self._lock:
+                self.stats["shared_calls"] += 1
+            return in_flight.result()
+
+        try:
+            result = self._read_file(key)
+            if result is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                result = function_call(**arguments)
+                self._write_file(key, result)
+
+            self._store_in_memory(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["shared_calls"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _store_in_memory(self, key: str, result: Any) -> None:
+        size = len(json.dumps(result, default=str).encode())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[2]
+            self._memory[key] = (time.time() + self.cache_ttl, result, size)
+            self._memory_bytes += size
+
+            # Evict the least recently used results until both bounds are met
+            while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def _read_file(self, key: str) -> Optional[Any]:
+        cache_file = self.cache_dir / f"{key}.json"
+        try:
+            cache_data = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            return None
+        if time.time() - cache_data.get("timestamp", 0) > self.cache_ttl:
+            cache_file.unlink(missing_ok=True)
+            return None
+        return cache_data.get("result")
+
+    def _write_file(self, key: str, result: Any) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / f"{key}.json").write_text(json.dumps({"timestamp": time.time(), "result": result}))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write tool result to the file cache: {e}")
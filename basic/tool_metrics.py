@@ -0,0 +1,158 @@
+"""
+In-memory tool call metrics for the tool hook examples.
+
+`ToolMetrics` is a tool hook recording per-tool latency histograms, error counts and result
+sizes, exported as a JSON snapshot or in the Prometheus text format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from inspect import isasyncgen, isawaitable, isgenerator
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from tool_cache import TieredToolCache
+
+
+class ToolMetrics:
+    """
+    Tool hook that records per-tool latency histograms, error counts and result sizes in memory.
+
+    Timings use time.perf_counter_ns() and each call only bumps preallocated counters, so
+    the hook is cheap enough to leave on in production. Export the metrics with
+    to_prometheus() or snapshot(). Use the instance as the hook of sync tools and its
+    acall method as the hook of async tools.
+
+    Args:
+        tool_cache: Optional tool cache whose hit ratio is exported with the metrics
+    """
+
+    # Upper bounds of the latency histogram buckets, in seconds
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, tool_cache: Optional[TieredToolCache] = None):
+        self.tool_cache = tool_cache
+        self._bucket_bounds_ns = [int(bound * 1e9) for bound in self.BUCKETS]
+        # tool name -> [bucket counts (last one is +Inf), count, total ns, errors, result bytes]
+        self._tools: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        start_ns = time.perf_counter_ns()
+        try:
+            result = function_call(**arguments)
+        except Exception:
+            self._record(function_name, time.perf_counter_ns() - start_ns, error=True, result_bytes=0)
+            raise
+        if isgenerator(result):
+            return self._timed_generator(function_name, start_ns, result)
+        self._record(function_name, time.perf_counter_ns() - start_ns, error=False, result_bytes=self._size(result))
+        return result
+
+    async def acall(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        """
+        Async version of the hook, for async tools and team delegation in async runs.
+
+        In async runs agno hands hooks of async tools a coroutine function, so a sync hook
+        would return the coroutine un-awaited. This one awaits it, and times async generators
+        (like the team's delegation tool) until they are exhausted. agno skips async hooks in
+        sync runs.
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            result = function_call(**arguments)
+            if isawaitable(result):
+                result = await result
+        except Exception:
+            self._record(function_name, time.perf_counter_ns() - start_ns, error=True, result_bytes=0)
+            raise
+        if isasyncgen(result):
+            return self._timed_async_generator(function_name, start_ns, result)
+        self._record(function_name, time.perf_counter_ns() - start_ns, error=False, result_bytes=self._size(result))
+        return result
+
+    @staticmethod
+    def _size(result: Any) -> int:
+        return len(result) if isinstance(result, (str, bytes)) else 0
+
+    def _timed_generator(self, function_name: str, start_ns: int, result: Iterator[Any]) -> Iterator[Any]:
+        result_bytes, error = 0, False
+        try:
+            for item in result:
+                result_bytes += self._size(item)
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._record(function_name, time.perf_counter_ns() - start_ns, error=error, result_bytes=result_bytes)
+
+    async def _timed_async_generator(
+        self, function_name: str, start_ns: int, result: AsyncIterator[Any]
+    ) -> AsyncIterator[Any]:
+        result_bytes, error = 0, False
+        try:
+            async for item in result:
+                result_bytes += self._size(item)
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._record(function_name, time.perf_counter_ns() - start_ns, error=error, result_bytes=result_bytes)
+
+    def _record(self, function_name: str, duration_ns: int, error: bool, result_bytes: int) -> None:
+        bucket = bisect_left(self._bucket_bounds_ns, duration_ns)
+        with self._lock:
+            stats = self._tools.get(function_name)
+            if stats is None:
+                stats = self._tools[function_name] = [[0] * (len(self.BUCKETS) + 1), 0, 0, 0, 0]
+            stats[0][bucket] += 1
+            stats[1] += 1
+            stats[2] += duration_ns
+            stats[3] += error
+            stats[4] += result_bytes
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serializable dict."""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": count,
+                    "errors": errors,
+                    "total_seconds": total_ns / 1e9,
+                    "result_bytes": result_bytes,
+                    "latency_buckets": dict(zip([*map(str, self.BUCKETS), "+Inf"], buckets)),
+                }
+                for name, (buckets, count, total_ns, errors, result_bytes) in self._tools.items()
+            }
+        snapshot: Dict[str, Any] = {"tools": tools}
+        if self.tool_cache is not None:
+            snapshot["cache"] = {**self.tool_cache.stats, "hit_ratio": self.tool_cache.hit_ratio}
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP agno_tool_call_duration_seconds Tool call latency.",
+            "# TYPE agno_tool_call_duration_seconds histogram",
+        ]
+        with self._lock:
+            tools = [(name, list(stats[0]), *stats[1:]) for name, stats in self._tools.items()]
+        for name, buckets, count, total_ns, _, _ in tools:
+            cumulative = 0
+            for bound, bucket_count in zip([*map(str, self.BUCKETS), "+Inf"], buckets):
+                cumulative += bucket_count
+                lines.append(f'agno_tool_call_duration_seconds_bucket{{tool="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'agno_tool_call_duration_seconds_sum{{tool="{name}"}} {total_ns / 1e9}')
+            lines.append(f'agno_tool_call_duration_seconds_count{{tool="{name}"}} {count}')
+
+        lines += ["# HELP agno_tool_call_errors_total Failed tool calls.", "# TYPE agno_tool_call_errors_total counter"]
+        lines += [f'agno_tool_call_errors_total{{tool="{name}"}} {errors}' for name, _, _, _, errors, _ in tools]
+        lines += ["# HELP agno_tool_result_bytes_total Size of tool results.", "# TYPE agno_tool_result_bytes_total counter"]
+        lines += [f'agno_tool_result_bytes_total{{tool="{name}"}} {size}' for name, _, _, _, _, size in tools]
+
+        if self.tool_cache is not None:
+            lines += ["# HELP agno_tool_cache_hit_ratio Tool cache hit ratio.", "# TYPE agno_tool_cache_hit_ratio gauge"]
+            lines.append(f"agno_tool_cache_hit_ratio {self.tool_cache.hit_ratio}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,40 @@
+"""
+Toolkit base class whose tool schemas are built once per process.
+
+By default agno introspects the signature and docstring of every toolkit method on every agent
+run. The schema only depends on the method, so `CachedSchemaToolkit` computes it once, caches it
+by the underlying function and reuses it for every instance of the toolkit.
+"""
+
+from copy import deepcopy
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agno.tools import Toolkit
+from agno.tools.function import Function
+
+# JSON schemas (parameters, description) of toolkit methods, shared by every instance in the process
+_TOOL_SCHEMA_CACHE: Dict[Callable, Tuple[Dict[str, Any], Optional[str]]] = {}
+
+
+class CachedSchemaToolkit(Toolkit):
+    """Toolkit that reuses the JSON schema of its sync and async tools across instances and runs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_tool_schemas()
+
+    def _cache_tool_schemas(self) -> None:
+        # Relies on agno internals (checked against agno 2.4): process_entrypoint() both builds the
+        # schema and wraps the entrypoint with Function._wrap_callable, and skip_entrypoint_processing
+        # stops agno from doing it again on each run. Revisit when upgrading agno.
+        for function in [*self.functions.values(), *self.async_functions.values()]:
+            key = getattr(function.entrypoint, "__func__", function.entrypoint)
+            if key in _TOOL_SCHEMA_CACHE:
+                parameters, description = _TOOL_SCHEMA_CACHE[key]
+                function.parameters = deepcopy(parameters)
+                function.description = function.description or description
+                function.entrypoint = Function._wrap_callable(function.entrypoint)
+            else:
+                function.process_entrypoint()
+                _TOOL_SCHEMA_CACHE[key] = (deepcopy(function.parameters), function.description)
+            function.skip_entrypoint_processing = True
@@ -0,0 +1,22 @@
+import zlib
+
+import numpy as np
+import pytest
+from memory_index import MemoryIndex
+
+
+class HashingEmbedder:
+    """Offline embedder: hashed bag of words."""
+
+    id = "hashing"
+
+    def get_embedding(self, text: str) -> list:
+        vector = np.zeros(64, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip("?.,!").encode()) % 64] += 1.0
+        return vector.tolist()
+
+
+@pytest.fixture
+def memory_index(tmp_path):
+    return MemoryIndex(embedder=HashingEmbedder(), cache_file=str(tmp_path / "embeddings.db"))
@@ -0,0 +1,55 @@
+"""Offline agno model for the tests: replies from a script instead of calling a provider."""
+
+import copy
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+
+
+def tool_call(name: str, **arguments: Any) -> Dict[str, Any]:
+    """A tool call in the OpenAI format agno expects from a model."""
+    return {"id": f"call_{name}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+@dataclass
+class ScriptedModel(Model):
+    """Answers a user message with `tool_calls` when set, and everything else with a fixed text."""
+
+    id: str = "scripted"
+    name: str = "Scripted"
+    provider: str = "Scripted"
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    # Messages of every request, to check what reached the model
+    requests: List[List[Message]] = field(default_factory=list)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ScriptedModel":
+        # Agents and memory managers run on deep copies of their model; keep recording into the same list
+        return copy.copy(self)
+
+    def _reply(self, messages: List[Message]) -> ModelResponse:
+        self.requests.append(list(messages))
+        if self.tool_calls and messages[-1].role == "user":
+            return ModelResponse(role="assistant", tool_calls=[dict(call) for call in self.tool_calls])
+        return ModelResponse(role="assistant", content=f"Answer from the {self.id} model")
+
+    def invoke(self, messages: List[Message], **kwargs) -> ModelResponse:
+        return self._reply(messages)
+
+    async def ainvoke(self, messages: List[Message], **kwargs) -> ModelResponse:
+        return self._reply(messages)
+
+    def invoke_stream(self, messages: List[Message], **kwargs) -> Iterator[ModelResponse]:
+        yield self._reply(messages)
+
+    async def ainvoke_stream(self, messages: List[Message], **kwargs) -> AsyncIterator[ModelResponse]:
+        yield self._reply(messages)
+
+    def _parse_provider_response(self, response: ModelResponse, **kwargs) -> ModelResponse:
+        return response
+
+    def _parse_provider_response_delta(self, response: ModelResponse) -> ModelResponse:
+        return response
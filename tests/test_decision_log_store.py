@@ -0,0 +1,32 @@
+from agno.db.sqlite import SqliteDb
+from agno.learn import DecisionLogConfig
+from agno.learn.schemas import DecisionLog
+from agno.learn.utils import to_dict_safe
+from decision_log_store import IndexedDecisionLogStore
+
+
+def save_stock_decision(db: SqliteDb, i: int) -> None:
+    decision = DecisionLog(id=f"dec_{i:04d}", decision=f"Chose to retry request {i}", agent_id="agent")
+    db.upsert_learning(id=decision.id, learning_type="decision_log", agent_id="agent", content=to_dict_safe(decision))
+
+
+def test_import_learnings_pages_and_skips_imported_decisions(tmp_path):
+    db = SqliteDb(db_file=str(tmp_path / "agents.db"))
+    for i in range(25):
+        save_stock_decision(db, i)
+    store = IndexedDecisionLogStore(config=DecisionLogConfig(db=db))
+
+    assert store.import_learnings(batch_size=10) == 25
+    assert store.count() == 25
+
+    save_stock_decision(db, 25)
+    assert store.import_learnings(batch_size=10) == 1
+    assert store.get("dec_0025").decision == "Chose to retry request 25"
+
+
+def test_wordless_query_matches_nothing(tmp_path):
+    db = SqliteDb(db_file=str(tmp_path / "agents.db"))
+    store = IndexedDecisionLogStore(config=DecisionLogConfig(db=db))
+    store.save(DecisionLog(id="dec_1", decision="Chose to retry", agent_id="agent"))
+    assert store.query(text_query="?!").decisions == []
+    assert store.count(text_query="retry") == 1
@@ -0,0 +1,58 @@
+import pytest
+from agno.db.base import SessionType
+from agno.db.json import JsonDb
+from agno.run.agent import RunOutput
+from agno.run.base import RunStatus
+from agno.session import AgentSession, TeamSession
+from json_store import ShardedJsonDb
+
+
+def make_session(session_id: str = "session", turn: int = 0) -> AgentSession:
+    # An open run is written again on every upsert, which leaves dead records behind
+    run = RunOutput(run_id="run-0", agent_id="agent", content="x" * 200 * (turn + 1), status=RunStatus.running)
+    return AgentSession(session_id=session_id, agent_id="agent", user_id="alice", runs=[run])
+
+
+def test_compaction_survives_a_crash_before_the_index_is_rewritten(tmp_path, monkeypatch):
+    db = ShardedJsonDb(db_path=str(tmp_path), num_shards=1, compact_min_bytes=4096)
+    monkeypatch.setattr(db, "_rewrite_index", lambda: (_ for _ in ()).throw(OSError("crash")))
+    with pytest.raises(OSError):
+        for turn in range(20):
+            db.upsert_session(make_session(turn=turn))
+
+    reopened = ShardedJsonDb(db_path=str(tmp_path), num_shards=1, compact_min_bytes=4096)
+    session = reopened.get_session("session", SessionType.AGENT)
+    assert len(session.runs[0].content) == 200 * (turn + 1)
+
+
+def test_compaction_keeps_sessions_readable(tmp_path):
+    db = ShardedJsonDb(db_path=str(tmp_path), num_shards=1, compact_min_bytes=4096)
+    for turn in range(20):
+        db.upsert_session(make_session(turn=turn))
+    assert db._generations["000"] > 0
+    assert [path.name for path in db.sessions_dir.glob("000*.jsonl")] == [db._shard_path("000").name]
+
+    reopened = ShardedJsonDb(db_path=str(tmp_path), num_shards=1, compact_min_bytes=4096)
+    assert len(reopened.get_session("session", SessionType.AGENT).runs[0].content) == 200 * 20
+
+
+def test_get_sessions_without_type_lists_every_type(tmp_path):
+    db = ShardedJsonDb(db_path=str(tmp_path))
+    db.upsert_session(make_session())
+    db.upsert_session(TeamSession(session_id="team-session", team_id="team"))
+    sessions = db.get_sessions()
+    assert sorted(type(session).__name__ for session in sessions) == ["AgentSession", "TeamSession"]
+
+
+def test_sessions_of_a_plain_json_db_are_read_then_moved(tmp_path):
+    JsonDb(db_path=str(tmp_path)).upsert_session(make_session("legacy"))
+
+    db = ShardedJsonDb(db_path=str(tmp_path))
+    session = db.get_session("legacy", SessionType.AGENT)
+    assert session.runs[0].run_id == "run-0"
+
+    db.upsert_session(session)
+    assert "legacy" in db._index
+    assert db.delete_session("legacy")
+    assert db.get_session("legacy", SessionType.AGENT) is None
+    assert ShardedJsonDb(db_path=str(tmp_path)).get_session("legacy", SessionType.AGENT) is None
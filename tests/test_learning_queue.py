@@ -0,0 +1,33 @@
+import threading
+import time
+
+from agno.learn import LearningMachine
+from learning_queue import QueuedLearningMachine
+
+
+def test_worker_survives_a_failing_item(monkeypatch):
+    def process(self, messages, **kwargs):
+        if messages == ["bad"]:
+            raise RuntimeError("store exploded")
+
+    monkeypatch.setattr(LearningMachine, "process", process)
+    learning = QueuedLearningMachine(workers=1)
+    learning.process(["bad"], session_id="session")
+    learning.process(["good"], session_id="session")
+    assert learning.flush(timeout=5)
+    assert learning.stats["failed"] == 1
+    assert learning.stats["processed"] == 1
+    learning.close()
+
+
+def test_close_gives_up_after_its_timeout(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(LearningMachine, "process", lambda self, messages, **kwargs: release.wait())
+    learning = QueuedLearningMachine(workers=1, close_timeout=0.1)
+    learning.process(["slow"], session_id="session")
+
+    start = time.monotonic()
+    learning.close()
+    assert time.monotonic() - start < 2
+    release.set()
+    assert learning.flush(timeout=5)
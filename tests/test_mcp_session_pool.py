@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from agno.tools.mcp import MCPTools
+from mcp_session_pool import MCPSessionPool
+
+STUB_COMMAND = f"{sys.executable} {Path(__file__).parents[1] / 'basic' / 'mcp_stub_server.py'}"
+
+
+def test_key_separates_env_without_exposing_it():
+    first = MCPSessionPool._key({"command": "npx server", "env": {"API_KEY": "secret-1"}})
+    second = MCPSessionPool._key({"command": "npx server", "env": {"API_KEY": "secret-2"}})
+    assert first != second
+    assert "secret" not in first + second
+
+
+def test_failed_connect_keeps_its_cause(monkeypatch):
+    refused = OSError("connection refused")
+
+    async def fail(self):
+        raise refused
+
+    async def connect():
+        async with MCPSessionPool().session(command=STUB_COMMAND):
+            pass
+
+    monkeypatch.setattr(MCPTools, "_connect", fail)
+    with pytest.raises(ConnectionError) as excinfo:
+        asyncio.run(connect())
+    assert excinfo.value.__cause__ is refused
+
+
+def test_reconnect_leaves_leased_session_open():
+    async def reconnect():
+        pool = MCPSessionPool(health_check_interval=0.0)
+        try:
+            async with pool.session(command=STUB_COMMAND) as leased:
+                first = pool._sessions[pool._key({"command": STUB_COMMAND})]
+                first.last_checked = float("-inf")
+
+                async def dead() -> bool:
+                    return False
+
+                leased.is_alive = dead
+                async with pool.session(command=STUB_COMMAND) as replacement:
+                    assert replacement is not leased
+                # The run holding the old session can still call it
+                assert not first.stop.is_set()
+                assert await leased.functions["echo"].entrypoint(text="ping")
+            assert first.stop.is_set()
+            assert pool.stats["reconnects"] == 1
+        finally:
+            await pool.close()
+
+    asyncio.run(reconnect())
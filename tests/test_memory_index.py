@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+from agno.db.schemas.memory import UserMemory
+from agno.db.sqlite import SqliteDb
+from async_db import ExecutorDb
+from memory_index import IndexedMemoryManager
+from scripted_model import ScriptedModel, tool_call
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+def test_async_extraction_sends_relevant_memories_and_updates_index(tmp_path, memory_index, async_db):
+    db = SqliteDb(db_file=str(tmp_path / "memories.db"))
+    db.upsert_user_memory(UserMemory(memory_id="tea", memory="Prefers green tea", user_id="alice"))
+    db.upsert_user_memory(UserMemory(memory_id="stocks", memory="Invests in semiconductor stocks", user_id="alice"))
+    model = ScriptedModel(id="memory", tool_calls=[tool_call("add_memory", memory="Likes jasmine tea")])
+    memory_manager = IndexedMemoryManager(
+        model=model, db=ExecutorDb(db) if async_db else db, top_k=1, index=memory_index
+    )
+
+    async def extract():
+        await memory_manager.acreate_user_memories(message="I like jasmine tea", user_id="alice")
+        return await memory_manager.asearch("alice", "jasmine tea")
+
+    found = asyncio.run(extract())
+
+    memory_prompt = model.requests[0][0].content
+    assert "Prefers green tea" in memory_prompt
+    assert "semiconductor" not in memory_prompt
+    assert [memory.memory for memory in found] == ["Likes jasmine tea"]
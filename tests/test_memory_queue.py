@@ -0,0 +1,72 @@
+import asyncio
+
+from agno.agent import Agent
+from agno.db.schemas.memory import UserMemory
+from agno.db.sqlite import SqliteDb
+from memory_queue import BackgroundMemoryManager
+from scripted_model import ScriptedModel
+
+
+def make_agent(tmp_path, memory_index):
+    db = SqliteDb(db_file=str(tmp_path / "agents.db"))
+    db.upsert_user_memory(UserMemory(memory_id="tea", memory="Prefers green tea", user_id="alice"))
+    db.upsert_user_memory(UserMemory(memory_id="stocks", memory="Invests in semiconductor stocks", user_id="alice"))
+    memory_manager = BackgroundMemoryManager(
+        model=ScriptedModel(id="memory"),
+        db=db,
+        top_k=1,
+        debounce_seconds=60.0,
+        index=memory_index,
+    )
+    model = ScriptedModel(id="agent")
+    agent = Agent(
+        model=model,
+        db=db,
+        memory_manager=memory_manager,
+        pre_hooks=[memory_manager.retrieval_hook],
+        post_hooks=[memory_manager.queue_turn],
+    )
+    return agent, model, memory_manager
+
+
+def test_run_sees_relevant_and_provisional_memories(tmp_path, memory_index):
+    agent, model, memory_manager = make_agent(tmp_path, memory_index)
+    try:
+        agent.run("I also like jasmine tea", user_id="alice")
+        agent.run("Which green tea should I buy?", user_id="alice")
+
+        system_prompt = model.requests[-1][0].content
+        assert "Prefers green tea" in system_prompt
+        assert "semiconductor" not in system_prompt
+        # The first turn is not extracted yet, but the second run already sees it
+        assert "(said recently, not saved yet) I also like jasmine tea" in system_prompt
+
+        # Outside a run, every stored memory is listed
+        memories = agent.get_user_memories(user_id="alice")
+        assert {memory.memory_id for memory in memories} == {"tea", "stocks"}
+    finally:
+        memory_manager.close()
+
+
+def test_flush_runs_queued_extraction(tmp_path, memory_index):
+    agent, _, memory_manager = make_agent(tmp_path, memory_index)
+    try:
+        agent.run("I like jasmine tea", user_id="alice")
+        memory_manager.flush(user_id="alice")
+        assert memory_manager.stats == {"queued_turns": 1, "extractions": 1, "failed_extractions": 0}
+    finally:
+        memory_manager.close()
+
+
+def test_async_run_sees_relevant_and_provisional_memories(tmp_path, memory_index):
+    agent, model, memory_manager = make_agent(tmp_path, memory_index)
+    try:
+        asyncio.run(agent.arun("I also like jasmine tea", user_id="alice"))
+        asyncio.run(agent.arun("Which green tea should I buy?", user_id="alice"))
+
+        system_prompt = model.requests[-1][0].content
+        assert "Prefers green tea" in system_prompt
+        assert "semiconductor" not in system_prompt
+        assert "(said recently, not saved yet) I also like jasmine tea" in system_prompt
+    finally:
+        memory_manager.close()
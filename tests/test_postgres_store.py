@@ -0,0 +1,41 @@
+import pytest
+from agno.db.base import SessionType
+from agno.session import AgentSession
+from postgres_store import PooledSqliteDb
+from sqlalchemy import text
+
+
+def make_session() -> AgentSession:
+    return AgentSession(session_id="session", agent_id="agent", metadata={"topic": "tea"}, created_at=1_700_000_000)
+
+
+def test_unbatched_writes_are_visible_to_other_processes(tmp_path):
+    db = PooledSqliteDb(db_file=str(tmp_path / "agents.db"))
+    other_process = PooledSqliteDb(db_file=str(tmp_path / "agents.db"))
+    try:
+        db.upsert_session(make_session())
+        assert other_process.get_session("session", SessionType.AGENT).metadata == {"topic": "tea"}
+    finally:
+        db.close()
+        other_process.close()
+
+
+def test_batched_writes_are_committed_by_flush(tmp_path):
+    db = PooledSqliteDb(db_file=str(tmp_path / "agents.db"), batch_writes=True)
+    try:
+        db.upsert_session(make_session())
+        db.flush()
+        assert db.metrics.snapshot()["batched_writes"] == 1
+        assert PooledSqliteDb(db_file=str(tmp_path / "agents.db")).get_session("session", SessionType.AGENT)
+    finally:
+        db.close()
+
+
+def test_failed_queries_do_not_leak_start_times(tmp_path):
+    db = PooledSqliteDb(db_file=str(tmp_path / "agents.db"), pool_size=1, max_overflow=0)
+    with db.db_engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start"] == []
+    assert db.metrics.snapshot()["queries"] >= 1
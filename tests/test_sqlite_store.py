@@ -0,0 +1,78 @@
+from agno.db.base import SessionType
+from agno.run.agent import RunOutput
+from agno.run.base import RunStatus
+from agno.session import AgentSession
+from sqlite_store import BatchedSqliteDb, DeltaSqliteDb
+
+
+def make_session(*run_ids: str) -> AgentSession:
+    return AgentSession(
+        session_id="session",
+        agent_id="agent",
+        session_data={"session_state": {"turns": len(run_ids)}},
+        metadata={"topic": "tea"},
+        created_at=1_700_000_000,
+        runs=[RunOutput(run_id=run_id, agent_id="agent", status=RunStatus.completed) for run_id in run_ids],
+    )
+
+
+def test_delta_session_round_trip(tmp_path):
+    db = DeltaSqliteDb(db_file=str(tmp_path / "sessions.db"), compact_every=2)
+    try:
+        for turns in range(1, 6):
+            db.upsert_session(make_session(*[f"run-{i}" for i in range(turns)]))
+        stored = db.get_session("session", SessionType.AGENT)
+        assert [run.run_id for run in stored.runs] == [f"run-{i}" for i in range(5)]
+        assert stored.session_data["session_state"] == {"turns": 5}
+        assert stored.metadata == {"topic": "tea"}
+    finally:
+        db.close()
+
+
+def test_queued_header_does_not_follow_the_live_session(tmp_path):
+    db = DeltaSqliteDb(db_file=str(tmp_path / "sessions.db"))
+    try:
+        session = make_session("run-0")
+        db.upsert_session(session)
+        session.metadata["topic"] = "coffee"
+        db.flush()
+        assert db.get_session("session", SessionType.AGENT).metadata == {"topic": "tea"}
+    finally:
+        db.close()
+
+
+def test_dropped_delta_is_written_whole_by_the_next_upsert(tmp_path):
+    db = DeltaSqliteDb(db_file=str(tmp_path / "sessions.db"))
+    commit_batch = db._commit_batch
+    failing = True
+
+    def flaky_commit(batch):
+        if failing:
+            raise RuntimeError("disk I/O error")
+        commit_batch(batch)
+
+    db._commit_batch = flaky_commit
+    try:
+        db.upsert_session(make_session("run-0"))
+        db.flush()
+        assert db.stats["dropped"] == 1
+
+        failing = False
+        db.upsert_session(make_session("run-0", "run-1"))
+        stored = db.get_session("session", SessionType.AGENT)
+        assert [run.run_id for run in stored.runs] == ["run-0", "run-1"]
+        assert stored.session_data["session_state"] == {"turns": 2}
+    finally:
+        db.close()
+
+
+def test_pending_session_read_is_a_copy(tmp_path):
+    db = BatchedSqliteDb(db_file=str(tmp_path / "sessions.db"), batch_wait_seconds=1.0)
+    try:
+        db.upsert_session(make_session("run-0"))
+        pending = db.get_session("session", SessionType.AGENT)
+        pending.metadata["topic"] = "coffee"
+        db.flush()
+        assert db.get_session("session", SessionType.AGENT).metadata == {"topic": "tea"}
+    finally:
+        db.close()
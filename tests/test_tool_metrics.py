@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from agno.agent import Agent
+from agno.team import Team
+from scripted_model import ScriptedModel, tool_call
+from tool_metrics import ToolMetrics
+
+
+def make_team(metrics: ToolMetrics) -> Team:
+    member = Agent(name="News Agent", id="news-agent", model=ScriptedModel(id="member"), tool_hooks=[metrics])
+    delegation = tool_call("delegate_task_to_member", member_id="news-agent", task="Find HackerNews discussions")
+    return Team(
+        name="Research Team",
+        model=ScriptedModel(id="team", tool_calls=[delegation]),
+        members=[member],
+        tool_hooks=[metrics.acall],
+    )
+
+
+def test_async_delegation_runs_the_member_and_is_timed():
+    metrics = ToolMetrics()
+    run_output = asyncio.run(make_team(metrics).arun("Research NVIDIA"))
+
+    assert [response.content for response in run_output.member_responses] == ["Answer from the member model"]
+    delegation = metrics.snapshot()["tools"]["delegate_task_to_member"]
+    assert delegation["calls"] == 1
+    assert delegation["errors"] == 0
+    assert delegation["result_bytes"] > 0
+
+
+def test_failed_calls_are_counted_as_errors():
+    metrics = ToolMetrics()
+
+    def failing_tool():
+        raise ValueError("upstream timeout")
+
+    with pytest.raises(ValueError):
+        metrics("failing_tool", failing_tool, {})
+    assert metrics.snapshot()["tools"]["failing_tool"]["errors"] == 1
+    assert 'agno_tool_call_errors_total{tool="failing_tool"} 1' in metrics.to_prometheus()